@@ -1,8 +1,15 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.routes import router
+from app.api.routes import router, embedding_model
 from prometheus_fastapi_instrumentator import Instrumentator
 
-app = FastAPI(debug=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 임베딩 micro-batch 워커 정리
+    await embedding_model.aclose()
+
+app = FastAPI(debug=True, lifespan=lifespan)
 app.include_router(router)
 
 Instrumentator().instrument(app).expose(app)
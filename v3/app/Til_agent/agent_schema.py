@@ -24,11 +24,17 @@ class FileSchema(BaseModel):
     node_id: Optional[int] = Field(default=None, description="커밋된 파일의 노드 아이디")
     patches:List[PatchSchema]
 
+class FileAnalysisState(BaseModel):
+    """파일별 요약 노드로 Send 되는 입력"""
+    file: FileSchema
+
 class CommitAnalysisSchema(BaseModel):
     filename: str = Field(description="파일 이름")
     code_review: str = Field(description="커밋 변경 내용 요약")
     code: str = Field(description = "커밋이 반영된 코드")
     code_diff: List[PatchSchema] = Field(description="커밋에 적용된 코드 조각 리스트")
+    token_budget: Optional[int] = Field(default=None, description="코드 리뷰 프롬프트의 코드 토큰 예산")
+    trimmed_tokens: Optional[int] = Field(default=None, description="예산에 맞추기 위해 잘라낸 코드 토큰 수")
 
 class CommitDataSchema(BaseModel):
     username:str = Field(description="GitHub 유저 이름")
@@ -54,8 +60,9 @@ class ReportState(MessagesState):
     section: CommitAnalysisSchema
     section_report: str = ""
     search_queries: list[SearchQuery] = []
-    search_iterations: int = 3
+    search_iterations: int = 3 # Max search rounds for this section (falls back to configurable.max_search_iterations)
     source_result: Annotated[str, operator.add] = None # String of formatted source content from web search
+    completed_sections: List["CommitReportSchema"] # Report written by this research branch
 
 class SectionWriterInput(BaseModel):
     """Section of the report."""
@@ -109,6 +116,13 @@ class Conclusion(BaseModel):
         description="Conclusion의 내용, 보고서의 결론을 제공합니다."
     )
 
+class FinalizeReport(BaseModel):
+    """Concept, Introduction, Conclusion을 한 번에 작성 (single-shot finalize)"""
+    concept: str = Field(description="오늘 배운 개념에 대한 정리")
+    keywords: List[str] = Field(description="오늘 배운 개념에 대한 키워드")
+    introduction: str = Field(description="보고서의 개요를 제공하는 Introduction 내용")
+    conclusion: str = Field(description="Introduction과 본문 내용을 취합한 회고(Conclusion) 내용")
+
 # No-op tool to indicate that the report writing is complete
 class FinishReport(BaseModel):
     """보고서를 종료합니다."""
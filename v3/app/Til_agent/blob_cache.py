@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class BlobCacheConfig:
+    CACHE_DIR: str = os.getenv("GITHUB_BLOB_CACHE_DIR", ".cache/github_blobs")
+    MAX_MEMORY_BYTES: int = int(os.getenv("GITHUB_BLOB_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+    MAX_DISK_BYTES: int = int(os.getenv("GITHUB_BLOB_CACHE_DISK_BYTES", 1024 * 1024 * 1024))
+
+
+class BlobCache:
+    """
+    (owner, repo, blob sha) 를 키로 하는 GitHub raw 파일 캐시
+    - 메모리 / 디스크 2단 LRU, 각 단은 바이트 크기로 상한이 정해짐
+    - blob sha는 파일 내용의 해시이므로 캐시된 내용은 만료되지 않음
+    """
+
+    def __init__(self, config: BlobCacheConfig = BlobCacheConfig()):
+        self.config = config
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(owner: str, repo: str, blob_sha: str) -> str:
+        return hashlib.sha256(f"{owner}/{repo}/{blob_sha}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.config.CACHE_DIR, key[:2], key)
+
+    def _load_disk_index(self):
+        """기존 디스크 캐시를 mtime 순으로 읽어 LRU 인덱스를 복원"""
+        if not os.path.isdir(self.config.CACHE_DIR):
+            return
+        entries = []
+        for root, _, filenames in os.walk(self.config.CACHE_DIR):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(root, filename))
+                entries.append((stat.st_mtime, filename, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _put_memory(self, key: str, content: str):
+        size = len(content.encode("utf-8"))
+        if size > self.config.MAX_MEMORY_BYTES:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = content
+        self._memory_bytes += size
+        while self._memory_bytes > self.config.MAX_MEMORY_BYTES:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.encode("utf-8"))
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+            os.utime(path)  # 재시작 후에도 LRU 순서 유지
+            return content
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    def _write_disk(self, key: str, content: str):
+        data = content.encode("utf-8")
+        if len(data) > self.config.MAX_DISK_BYTES:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing blob cache {key}: {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.config.MAX_DISK_BYTES:
+                evicted_key, evicted_size = self._disk.popitem(last=False)
+                self._disk_bytes -= evicted_size
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            try:
+                os.remove(self._disk_path(evicted_key))
+            except OSError:
+                pass
+
+    async def get(self, owner: str, repo: str, blob_sha: Optional[str]) -> Optional[str]:
+        if not blob_sha:
+            return None
+        key = self.make_key(owner, repo, blob_sha)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            with self._lock:
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        content = await asyncio.to_thread(self._read_disk, key)
+        if content is None:
+            self.misses += 1
+            return None
+        self._put_memory(key, content)
+        self.hits += 1
+        return content
+
+    async def put(self, owner: str, repo: str, blob_sha: Optional[str], content: str):
+        if not blob_sha:
+            return
+        key = self.make_key(owner, repo, blob_sha)
+        self._put_memory(key, content)
+        await asyncio.to_thread(self._write_disk, key, content)
+
+
+blob_cache = BlobCache()
@@ -0,0 +1,129 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import tiktoken
+
+# 함수/클래스 시그니처로 취급할 줄 (Python, JS/TS, Java/Kotlin, Go, Rust 등)
+SIGNATURE_PATTERN = re.compile(
+    r"^\s*(?:@\w+.*|(?:async\s+)?def\s|class\s|interface\s|(?:export\s+)?(?:default\s+)?(?:async\s+)?function\b"
+    r"|(?:public|private|protected|internal|static|final|abstract|override|suspend)\s.*\(|fun\s|func\s|fn\s|impl\b)"
+)
+CHANGE_MARKERS = ("[+]", "[-]")
+
+
+@dataclass
+class CodeWindow:
+    """토큰 예산에 맞춰 잘라낸 코드와 그 통계"""
+    code: str
+    token_budget: int
+    original_tokens: int
+    window_tokens: int
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return self.original_tokens - self.window_tokens
+
+
+@lru_cache()
+def get_encoding(model_name: str = "gpt-3.5-turbo") -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def encode_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> list[int]:
+    # 소스 코드 / 검색 결과에 <|endoftext|> 같은 문자열이 있어도 예외 없이 일반 텍스트로 인코딩
+    return get_encoding(model_name).encode(text, disallowed_special=())
+
+
+def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
+    return len(encode_tokens(text, model_name))
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _enclosing_signatures(lines: list[str]) -> list[tuple]:
+    """각 줄을 감싸는 시그니처 줄 번호 목록 (들여쓰기 기준 스택, 한 번의 순회로 계산)"""
+    stack = []  # (indent, idx)
+    enclosing = []
+    for idx, line in enumerate(lines):
+        content = line[3:] if line.startswith(CHANGE_MARKERS) else line
+        if content.strip():
+            indent = _indent(content)
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+        enclosing.append(tuple(i for _, i in stack))
+        if content.strip() and SIGNATURE_PATTERN.match(content):
+            stack.append((_indent(content), idx))
+    return enclosing
+
+
+def _render(lines: list[str], keep: list[int]) -> str:
+    rendered = []
+    prev = -1
+    for idx in keep:
+        if idx - prev > 1:
+            rendered.append(f"... ({idx - prev - 1}줄 생략)")
+        rendered.append(lines[idx])
+        prev = idx
+    if prev < len(lines) - 1:
+        rendered.append(f"... ({len(lines) - 1 - prev}줄 생략)")
+    return "\n".join(rendered)
+
+
+def _select(lines: list[str], changed: list[int], enclosing: list[tuple], context_lines: int, with_signatures: bool) -> list[int]:
+    keep = set()
+    for idx in changed:
+        keep.update(range(max(0, idx - context_lines), min(len(lines), idx + context_lines + 1)))
+        if with_signatures:
+            keep.update(enclosing[idx])
+    return sorted(keep)
+
+
+def build_code_window(
+    annotated_code: str,
+    token_budget: int,
+    context_lines: int = 10,
+    model_name: str = "gpt-3.5-turbo",
+) -> CodeWindow:
+    """
+    [+]/[-] 주석된 코드에서 변경 hunk와 앞뒤 context_lines 줄, 변경을 감싸는 함수/클래스 시그니처만 남기고
+    token_budget 이하가 될 때까지 context → 시그니처 → 뒤쪽 hunk 순으로 줄입니다.
+    """
+    lines = annotated_code.splitlines()
+    original_tokens = count_tokens(annotated_code, model_name)
+    changed = [idx for idx, line in enumerate(lines) if line.startswith(CHANGE_MARKERS)]
+
+    if not changed:
+        window = annotated_code
+    else:
+        enclosing = _enclosing_signatures(lines)
+        window = None
+        context = context_lines
+        # context 줄 수를 절반씩 줄여가며 예산에 맞추기
+        while True:
+            window = _render(lines, _select(lines, changed, enclosing, context, with_signatures=True))
+            if context == 0 or count_tokens(window, model_name) <= token_budget:
+                break
+            context //= 2
+        if count_tokens(window, model_name) > token_budget:
+            window = _render(lines, _select(lines, changed, enclosing, 0, with_signatures=False))
+        if count_tokens(window, model_name) >= original_tokens:
+            window = annotated_code
+
+    # 그래도 넘치면 앞쪽 hunk부터 예산만큼만 유지
+    tokens = encode_tokens(window, model_name)
+    if len(tokens) > token_budget:
+        window = get_encoding(model_name).decode(tokens[:token_budget]) + "\n... (토큰 예산 초과로 생략)"
+        tokens = encode_tokens(window, model_name)
+
+    return CodeWindow(
+        code=window,
+        token_budget=token_budget,
+        original_tokens=original_tokens,
+        window_tokens=len(tokens),
+    )
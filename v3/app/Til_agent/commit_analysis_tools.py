@@ -1,53 +1,129 @@
 from datetime import datetime
+from typing import Awaitable, Callable, Optional
+import asyncio
 import os
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
+from .github_fetcher import github_fetcher
+from .blob_cache import blob_cache
 
 class CommitTools:
 
     @staticmethod
-    def _get_retry_session(retries=5, backoff_factor=1.0, status_forcelist=(502, 503, 504)):
-        """자동 재시도 가능한 requests 세션 생성"""
-        session = requests.Session()
-        retry = Retry(
-            total=retries,
-            read=retries,
-            connect=retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=status_forcelist,
-            raise_on_status=False  # 상태코드가 4xx, 5xx여도 예외를 던지지 않음
+    async def _get_range_commit(
+        owner: str,
+        repo: str,
+        sha_list: list,
+        fetch_json: Callable[[str], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        """
+        sha_list가 하나의 연속된 커밋 구간이면 compare API로 구간 전체의 변경 파일을 한 번에 조회합니다.
+        구간 전체를 하나의 커밋처럼 취급한 commit json을 반환하며, 연속되지 않으면 None을 반환합니다.
+        compare 응답의 파일 patch는 구간 전체를 합친 diff이고 커밋별 변경 파일 목록은 없으므로,
+        파일마다 구간의 커밋 메시지 전체를 붙입니다 (파일별 리뷰 프롬프트는 합쳐진 diff를 구간 전체의 맥락으로 해석).
+        커밋별로 파일을 구분하려면 커밋 수만큼 조회가 필요해 구간 조회의 이점이 사라집니다.
+        """
+        compare_url = "https://api.github.com/repos/{owner}/{repo}/compare/{base}...{head}"
+        base, head = sha_list[-1], sha_list[0]
+
+        compare_json = await fetch_json(compare_url.format(owner=owner, repo=repo, base=base, head=head))
+        if compare_json is not None and compare_json.get("status") == "behind":
+            base, head = head, base
+            compare_json = await fetch_json(compare_url.format(owner=owner, repo=repo, base=base, head=head))
+        if compare_json is None or compare_json.get("status") != "ahead":
+            return None
+
+        # base 이후의 커밋 + base 자신이 정확히 sha_list와 일치해야 연속 구간
+        range_commits = compare_json["commits"] + [compare_json["base_commit"]]
+        range_shas = {commit["sha"] for commit in range_commits}
+        if compare_json.get("total_commits") != len(compare_json["commits"]) or range_shas != set(sha_list):
+            return None
+
+        base_parents = compare_json["base_commit"].get("parents", [])
+        if len(base_parents) != 1:
+            return None  # 루트 커밋 또는 머지 커밋
+
+        # base의 부모부터 비교해야 base 커밋의 변경 사항까지 포함됨
+        range_json = await fetch_json(
+            compare_url.format(owner=owner, repo=repo, base=base_parents[0]["sha"], head=head)
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+        if range_json is None or len(range_json.get("files", [])) >= github_fetcher.config.COMPARE_MAX_FILES:
+            return None  # 파일 목록이 잘렸을 수 있음
+
+        commits_by_sha = {commit["sha"]: commit for commit in range_commits}
+        return {
+            "commit": {
+                "message": "\n".join(commits_by_sha[sha]["commit"]["message"] for sha in sha_list),
+                "committer": commits_by_sha[sha_list[-1]]["commit"]["committer"],
+            },
+            "files": range_json.get("files", []),
+        }
 
     @staticmethod
-    async def get_commit_data(owner: str, repo: str, sha_list: list, branch: str, github_token: str) -> dict:
+    async def get_commit_data(
+        owner: str,
+        repo: str,
+        sha_list: list,
+        branch: str,
+        github_token: str,
+        batch: bool = github_fetcher.config.BATCH_COMPARE,
+    ) -> dict:
         """
         GitHub에서 특정 커밋들의 변경 파일과 패치 내용을 가져오는 도구입니다.
+        커밋 조회와 raw 코드 조회는 공유 커넥션 풀 위에서 병렬로 수행됩니다.
+        batch=True 이고 sha_list가 연속된 구간이면 커밋별 조회 대신 compare API로 한 번에 조회합니다.
         """
         headers = {
             "Authorization": f"Bearer {github_token}",
             "Accept": "application/vnd.github+json"
         }
 
-        session = CommitTools._get_retry_session()
+        request_pool = github_fetcher.request_pool()
 
-        files_by_path = {}
+        async def fetch_json(url: str) -> Optional[dict]:
+            try:
+                async with request_pool:
+                    response = await github_fetcher.get(url, headers=headers)
+                return response.json()
+            except httpx.HTTPError as e:
+                print(f"Error fetching {url}: {e}")
+                return None
 
-        for sha in sha_list:
+        async def fetch_commit(sha: str):
             commit_url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}"
+            return await fetch_json(commit_url)  # 실패 시 None으로 해당 커밋 스킵
 
+        async def fetch_raw_code(filepath: str, raw_url: str, blob_sha: str) -> str:
+            # 동일한 blob은 네트워크 요청 없이 캐시에서 가져옴
+            cached_code = await blob_cache.get(owner, repo, blob_sha)
+            if cached_code is not None:
+                return cached_code
+            if not raw_url:
+                return ""
             try:
-                response = session.get(commit_url, headers=headers, timeout=60)
-                response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching commit {sha}: {e}")
-                continue  # 해당 커밋 스킵
+                async with request_pool:
+                    response = await github_fetcher.get(raw_url, headers=headers)
+                await blob_cache.put(owner, repo, blob_sha, response.text)
+                return response.text
+            except httpx.HTTPError as e:
+                print(f"Error fetching raw code for {filepath}: {e}")
+                return ""  # 오류 시 빈 문자열로 대체
+
+        range_commit = None
+        # compare는 최대 COMPARE_MAX_CALLS번 호출하므로, 커밋 수가 그보다 많을 때만 커밋별 조회보다 이득
+        if batch and len(set(sha_list)) > github_fetcher.config.COMPARE_MAX_CALLS:
+            range_commit = await CommitTools._get_range_commit(owner, repo, sha_list, fetch_json)
+
+        if range_commit is not None:
+            commits = [range_commit]
+        else:
+            # sha_list 순서를 유지한 채로 커밋을 병렬 조회
+            commits = await asyncio.gather(*(fetch_commit(sha) for sha in sha_list))
+            commits = [commit_json for commit_json in commits if commit_json is not None]
+
+        files_by_path = {}
+        raw_files = {}
 
-            commit_json = response.json()
+        for commit_json in commits:
             commit_message = commit_json["commit"]["message"]
             commit_date = commit_json["commit"]["committer"]["date"]
 
@@ -55,26 +131,26 @@ class CommitTools:
                 filepath = os.path.basename(file["filename"])
                 patch = file.get("patch")
 
-                try:
-                    raw_code_resp = session.get(file["raw_url"], headers=headers, timeout=60)
-                    raw_code_resp.raise_for_status()
-                    latest_code = raw_code_resp.text
-                except requests.exceptions.RequestException as e:
-                    print(f"Error fetching raw code for {filepath}: {e}")
-                    latest_code = ""  # 오류 시 빈 문자열로 대체
-
+                # latest_code는 파일이 처음 등장한 커밋의 raw 코드만 사용
                 if filepath not in files_by_path:
                     files_by_path[filepath] = {
                         "filepath": filepath,
-                        "latest_code": latest_code,
+                        "latest_code": "",
                         "patches": []
                     }
+                    raw_files[filepath] = (file.get("raw_url"), file.get("sha"))
 
                 files_by_path[filepath]["patches"].append({
                     "patch": patch,
                     "commit_message": commit_message
                 })
 
+        latest_codes = await asyncio.gather(
+            *(fetch_raw_code(filepath, raw_url, blob_sha) for filepath, (raw_url, blob_sha) in raw_files.items())
+        )
+        for filepath, latest_code in zip(raw_files, latest_codes):
+            files_by_path[filepath]["latest_code"] = latest_code
+
         output_data = {
             "date": datetime.fromisoformat(commit_date.replace("Z", "")).strftime("%Y-%m-%d"),
             "repo": repo,
@@ -82,4 +158,4 @@ class CommitTools:
             "files": list(files_by_path.values())
         }
 
-        return output_data
\ No newline at end of file
+        return output_data
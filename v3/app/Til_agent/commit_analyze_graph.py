@@ -1,58 +1,153 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, START, END
-from langchain_openai import AzureChatOpenAI
+from langgraph.types import Send
+from .llm_pool import get_azure_chat_model
 from .agent_schema import (
     CommitDataSchema,
     CommitAnalysisSchema,
+    FileAnalysisState,
     TilState
 )
 from unidiff import PatchSet
+from bisect import bisect_right
+from collections import defaultdict
+from typing import List, Optional
 from langchain_core.runnables import RunnableConfig
 from .config import MultiAgentConfiguration
 from .prompt import COMMIT_REVIEW_INSTRUCTIONS
 from .utils import get_config_value
+from .code_window import build_code_window
 from dotenv import load_dotenv
+import logging
 import os
 
 load_dotenv()
 
-def annotate_code_with_patch(latest_code: str, patch_text: str, filename: str) -> str:
+logger = logging.getLogger(__name__)
+
+def _parse_target_file(patch_text: Optional[str], filename: str):
+    """patch 텍스트에서 filename에 해당하는 PatchedFile (없으면 None)"""
+    if not patch_text:
+        return None
     # 유효한 patch 헤더 붙이기
     if not patch_text.startswith('--- '):
         patch_text = f"--- a/{filename}\n+++ b/{filename}\n" + patch_text
-
     patch = PatchSet(patch_text)
+    return next((f for f in patch if f.path == filename or f.path.endswith(filename)), None)
+
+
+def _hunk_target_start(hunk) -> int:
+    # target 줄이 없는 hunk(순수 삭제)의 target_start는 삭제 지점 "앞" 줄 번호 (파일 맨 앞이면 0)
+    return hunk.target_start if hunk.target_length else hunk.target_start + 1
+
+
+def _hunk_source_start(hunk) -> int:
+    return hunk.source_start if hunk.source_length else hunk.source_start + 1
+
+
+class _LineMapper:
+    """
+    patch 하나의 source 버전 줄 번호를 target 버전 줄 번호로 변환
+    반환값은 (target 줄 번호, 줄이 남아 있는지). 삭제된 줄은 삭제 지점의 다음 줄 번호를 돌려줍니다.
+    """
+
+    def __init__(self, target_file):
+        self.starts = []  # hunk별 source 시작 줄
+        self.ends = []  # hunk별 source 끝 줄 (미포함)
+        self.deltas = []  # 해당 hunk 이전까지의 누적 줄 수 변화
+        self.line_maps = []
+        delta = 0
+        for hunk in target_file:
+            line_map = {}
+            next_target = _hunk_target_start(hunk)
+            for line in hunk:
+                if line.is_removed:
+                    line_map[line.source_line_no] = (next_target, False)
+                    continue
+                if line.is_context:
+                    line_map[line.source_line_no] = (line.target_line_no, True)
+                next_target = line.target_line_no + 1
+            self.starts.append(_hunk_source_start(hunk))
+            self.ends.append(_hunk_source_start(hunk) + hunk.source_length)
+            self.deltas.append(delta)
+            self.line_maps.append(line_map)
+            delta += hunk.target_length - hunk.source_length
+        self.total_delta = delta
+
+    def map(self, line_no: int) -> tuple[int, bool]:
+        idx = bisect_right(self.starts, line_no) - 1
+        if idx < 0:
+            return line_no, True
+        if line_no < self.ends[idx]:
+            return self.line_maps[idx].get(line_no, (line_no + self.deltas[idx], True))
+        delta = self.deltas[idx + 1] if idx + 1 < len(self.deltas) else self.total_delta
+        return line_no + delta, True
+
+
+def annotate_code_with_patches(latest_code: str, patch_texts: List[Optional[str]], filename: str) -> str:
+    """
+    최신 코드에 여러 patch의 변경 사항을 [+] / [-] 표시로 주석합니다.
+    patch_texts는 최신 커밋부터 정렬되어 있어야 합니다 (patch_texts[0]이 latest_code를 만든 patch).
+    이전 patch의 줄 번호는 그 이후 patch들을 차례로 거쳐 최신 코드의 줄 번호로 변환한 뒤,
+    코드 줄과 한 번에 병합하므로 코드 길이 + 변경 줄 수에 비례하는 시간에 동작합니다.
+    """
     code_lines = latest_code.splitlines()
-    annotated = code_lines.copy()
 
-    target_file = next((f for f in patch if f.path == filename or f.path.endswith(filename)), None)
-    if not target_file:
+    added_lines = set()  # [+] 표시할 최신 코드의 줄 번호 (1부터 시작)
+    inserts = defaultdict(list)  # 줄 번호 앞에 끼워 넣을 줄 (삭제된 줄, 최신 코드에 남지 않은 추가 줄)
+
+    newer_mappers: List[_LineMapper] = []  # 현재 patch보다 최신인 patch들 (오래된 것부터)
+
+    def to_latest(line_no: int) -> tuple[int, bool]:
+        survived = True
+        for mapper in newer_mappers:
+            line_no, kept = mapper.map(line_no)
+            survived = survived and kept
+        return line_no, survived
+
+    for patch_text in patch_texts:
+        target_file = _parse_target_file(patch_text, filename)
+        if not target_file:
+            continue
+
+        for hunk in target_file:
+            next_target = _hunk_target_start(hunk)
+            for line in hunk:
+                if line.is_removed:
+                    inserts[to_latest(next_target)[0]].append(f"[-] {line.value.rstrip()}")
+                    continue
+                next_target = line.target_line_no + 1
+                if not line.is_added:
+                    continue
+                line_no, survived = to_latest(line.target_line_no)
+                idx = line_no - 1
+                # 최신 코드에 남아 있는 줄이면 주석만 덧붙이기
+                if survived and idx < len(code_lines) and code_lines[idx].strip() == line.value.strip():
+                    added_lines.add(line_no)
+                else:
+                    inserts[line_no].append("[+]" + line.value.rstrip())
+
+        newer_mappers.insert(0, _LineMapper(target_file))
+
+    if not added_lines and not inserts:
         return latest_code  # 변경 없음
 
-    offset = 0
-    for hunk in target_file:
-        for line in hunk:
-            if line.is_added and line.target_line_no is not None:
-                idx = line.target_line_no - 1
-                # 줄 내용이 동일하면 주석만 덧붙이기
-                if idx < len(annotated) and annotated[idx].strip() == line.value.strip():
-                    annotated[idx] = "[+]" + annotated[idx].rstrip()  
-                else:
-                    # 삽입이 필요한 경우에만 insert
-                    annotated.insert(idx,"[+]" + line.value.rstrip())
-                offset += 1
-            # 삭제된 줄도 표시
-            elif line.is_removed:
-                idx = line.source_line_no - 1 + offset
-                annotated.insert(idx, f"[-] {line.value.rstrip()}")
-                offset += 1
+    annotated = []
+    for line_no, code_line in enumerate(code_lines, start=1):
+        annotated.extend(inserts.get(line_no, ()))
+        annotated.append("[+]" + code_line.rstrip() if line_no in added_lines else code_line)
+    # 파일 끝 이후에 위치한 변경 사항
+    for line_no in sorted(k for k in inserts if k > len(code_lines)):
+        annotated.extend(inserts[line_no])
 
     return "\n".join(annotated)
 
+def annotate_code_with_patch(latest_code: str, patch_text: str, filename: str) -> str:
+    return annotate_code_with_patches(latest_code, [patch_text], filename)
+
 class CommitAnalysisGraph:
-    def __init__(self, no_files: int):
-        self.no_files = no_files
+    """파일 수와 무관하게 한 번만 컴파일되는 커밋 분석 그래프 (Send로 파일별 요약 노드를 fan-out)"""
 
     @staticmethod
     async def fork_files_nodes(state: CommitDataSchema) -> dict:
@@ -64,88 +159,94 @@ class CommitAnalysisGraph:
             "date": state.date,
         }
 
-    ## code analysis nodes
     @staticmethod
-    def make_code_summary_node(node_id: int):
-
-        async def summarize_code(state:CommitDataSchema) -> CommitDataSchema:
+    def continue_to_file_summaries(state: CommitDataSchema) -> list[Send]:
+        return [Send("summarize_file_node", {"file": file}) for file in state.files]
 
-            llm = AzureChatOpenAI(
-                azure_deployment="gpt-35-turbo",  
-                api_version="2024-12-01-preview",
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                temperature=0,
-                max_tokens=2048,
-                timeout=30,
-                max_retries=2,
-            )
-
-
-            files = state.files
-            system_prompt = COMMIT_REVIEW_INSTRUCTIONS
-            user_prompt = """[file name]: {file_name}
+    ## code analysis nodes
+    @staticmethod
+    async def summarize_code(state: FileAnalysisState, config: RunnableConfig) -> dict:
+
+        llm = get_azure_chat_model(
+            azure_deployment="gpt-35-turbo",
+            temperature=0,
+            max_tokens=2048,
+            timeout=30,
+            max_retries=2,
+        )
+
+        system_prompt = COMMIT_REVIEW_INSTRUCTIONS
+        user_prompt = """[file name]: {file_name}
     --------------------------------
     [code with patches]: {code}
     --------------------------------"""
-            
-            target_file = None
-            for file in files:
-                if file.node_id == node_id:
-                    target_file = file
-                    break
-            file_name = target_file.filepath
-            code = target_file.latest_code
-            patches = target_file.patches
-            patches_str = f"[commit message]: " + patches[0].commit_message + "\n"
-            patches_str += annotate_code_with_patch(code, patches[0].patch, file_name) + "\n"
-            patches_str += "--------------------------------"
-
-            code_analysis_prompt = ChatPromptTemplate.from_messages(
-                [
-                    ("system", system_prompt),
-                    ("user", user_prompt),
-                ]
-            )
-
-            code_analysis_chain = (
-                code_analysis_prompt 
-                | llm 
-                | StrOutputParser()
-            )
-            
-            result: CommitAnalysisSchema = await code_analysis_chain.ainvoke(
-                {
-                    "file_name": file_name, 
-                    "code": patches_str, 
-                }
-            )
-            
-            result_dict = {
-                "filename": file_name,
-                "code_review": result,
-                "code": code,
-                "code_diff": patches
-            }
 
-            commit_analysis_result = CommitAnalysisSchema(**result_dict)
-            return {'sections': [commit_analysis_result]}
+        target_file = state.file
+        file_name = target_file.filepath
+        code = target_file.latest_code
+        patches = target_file.patches
+        configurable = MultiAgentConfiguration.from_runnable_config(config)
+        # 변경 hunk 주변과 시그니처만 남겨 토큰 예산에 맞추기
+        code_window = build_code_window(
+            annotate_code_with_patches(code, [patch.patch for patch in patches], file_name),
+            token_budget=int(configurable.code_window_token_budget),
+            context_lines=int(configurable.code_window_context_lines),
+        )
+        logger.info(
+            f"[code window] {file_name}: budget={code_window.token_budget}, "
+            f"tokens={code_window.window_tokens}/{code_window.original_tokens}, trimmed={code_window.trimmed_tokens}"
+        )
+
+        patches_str = "".join(f"[commit message]: {patch.commit_message}\n" for patch in patches)
+        patches_str += code_window.code + "\n"
+        patches_str += "--------------------------------"
+
+        code_analysis_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", system_prompt),
+                ("user", user_prompt),
+            ]
+        )
+
+        code_analysis_chain = (
+            code_analysis_prompt 
+            | llm 
+            | StrOutputParser()
+        )
         
-        return summarize_code
+        result: CommitAnalysisSchema = await code_analysis_chain.ainvoke(
+            {
+                "file_name": file_name, 
+                "code": patches_str, 
+            }
+        )
+        
+        result_dict = {
+            "filename": file_name,
+            "code_review": result,
+            "code": code,
+            "code_diff": patches,
+            "token_budget": code_window.token_budget,
+            "trimmed_tokens": code_window.trimmed_tokens,
+        }
+
+        commit_analysis_result = CommitAnalysisSchema(**result_dict)
+        return {'sections': [commit_analysis_result]}
 
     def make_commit_analysis_graph(self):
         commit_analysis_graph = StateGraph(CommitDataSchema, output=TilState)
 
         # node
         commit_analysis_graph.add_node("fork_files_nodes", self.fork_files_nodes)
+        commit_analysis_graph.add_node("summarize_file_node", self.summarize_code)
         commit_analysis_graph.add_edge(START, "fork_files_nodes")
-
-        for i in range(self.no_files):
-            node_id = i+1
-            file_summary_node = self.make_code_summary_node(node_id)
-            commit_analysis_graph.add_node(f"summarize_file_node_{node_id}", file_summary_node)
-            commit_analysis_graph.add_edge("fork_files_nodes", f"summarize_file_node_{node_id}")
-            commit_analysis_graph.add_edge(f"summarize_file_node_{node_id}", END)
+        commit_analysis_graph.add_conditional_edges(
+            "fork_files_nodes",
+            self.continue_to_file_summaries,
+            ["summarize_file_node"]
+        )
+        commit_analysis_graph.add_edge("summarize_file_node", END)
         
         commit_analysis_graph = commit_analysis_graph.compile()
 
-        return commit_analysis_graph
\ No newline at end of file
+        return commit_analysis_graph
@@ -42,9 +42,16 @@ class MultiAgentConfiguration:
     # Multi-agent specific configuration
     number_of_queries: int = 2 # Number of search queries to generate per section
     code_analysis_model: str = "claude-3-5-haiku-20241022"
+    code_window_token_budget: int = 3000 # Max prompt tokens of annotated code per file
+    code_window_context_lines: int = 10 # Lines of context kept around each change
     supervisor_model: str = "gpt-4o-mini"
     researcher_model: str = "gpt-4o-mini"
     ask_for_clarification: bool = False # Whether to ask for clarification from the user
+    parallel_tool_calls: bool = False # Allow several tool calls per LLM turn and run them concurrently
+    max_tool_concurrency: int = 4 # Max tool calls executed at the same time when parallel_tool_calls is on
+    single_shot_finalize: bool = False # Write Concept/Introduction/Conclusion with one structured-output call after research
+    max_search_iterations: int = 3 # Max search rounds per research section
+    supervisor_context_turns: int = 1 # Recent supervisor tool turns sent verbatim, older ones are summarized (0 = full history)
     # MCP server configuration
     mcp_server_config: Optional[Dict[str, Any]] = None
     mcp_prompt: Optional[str] = None
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import re
+
+import aiohttp
+import lxml.html
+from bs4 import BeautifulSoup
+
+from .search_resources import search_resources
+
+
+class ContentExtractionConfig:
+    MAX_BYTES: int = int(os.getenv("CONTENT_MAX_BYTES", 512 * 1024))  # 페이지당 최대 다운로드 크기
+    CHUNK_SIZE: int = 64 * 1024
+    MAX_CHARS: int = 1000  # 연구 프롬프트에서 실제로 사용하는 raw_content 길이
+
+
+# 본문이 아닌 영역
+NON_CONTENT_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg")
+
+
+def extract_main_text(html: str, max_chars: int = ContentExtractionConfig.MAX_CHARS) -> str:
+    """lxml로 본문(article/main 우선) 텍스트만 추출해 max_chars로 자름"""
+    try:
+        document = lxml.html.fromstring(html)
+        for element in list(document.iter(*NON_CONTENT_TAGS)):
+            element.drop_tree()
+        candidates = document.xpath("//article") or document.xpath("//main") or document.xpath("//body") or [document]
+        text = " ".join(" ".join(candidate.itertext()) for candidate in candidates)
+    except Exception:
+        # 깨진 HTML 등 lxml이 처리하지 못하는 경우
+        text = BeautifulSoup(html, "html.parser").get_text(" ")
+    return re.sub(r"\s+", " ", text).strip()[:max_chars]
+
+
+async def read_limited(response: aiohttp.ClientResponse, max_bytes: int = ContentExtractionConfig.MAX_BYTES) -> bytes:
+    """응답 본문을 스트리밍으로 읽되 max_bytes까지만 보관"""
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(ContentExtractionConfig.CHUNK_SIZE):
+        body.extend(chunk[: max_bytes - len(body)])
+        if len(body) >= max_bytes:
+            break
+    return bytes(body)
+
+
+async def extract_page_content(response: aiohttp.ClientResponse) -> str:
+    """HTML 응답을 크기 제한 내에서 받아 워커 풀에서 본문 텍스트를 추출"""
+    body = await read_limited(response)
+    html = body.decode(response.charset or "utf-8", errors="replace")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(search_resources.executor, extract_main_text, html)
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+
+
+class GitHubFetcherConfig:
+    MAX_CONNECTIONS: int = int(os.getenv("GITHUB_MAX_CONNECTIONS", 32))
+    MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", 16))
+    MAX_PER_HOST: int = int(os.getenv("GITHUB_MAX_PER_HOST", 8))
+    MAX_CONCURRENCY: int = int(os.getenv("GITHUB_MAX_CONCURRENCY", 16))
+    TIMEOUT: float = float(os.getenv("GITHUB_TIMEOUT", 60))
+    RETRIES: int = 5
+    BACKOFF_FACTOR: float = 1.0
+    STATUS_FORCELIST: tuple = (502, 503, 504)
+    # 연속된 커밋 구간은 compare API 한 번으로 조회
+    BATCH_COMPARE: bool = os.getenv("GITHUB_BATCH_COMPARE", "true").lower() == "true"
+    COMPARE_MAX_FILES: int = 300  # compare API가 반환하는 최대 파일 수
+    COMPARE_MAX_CALLS: int = 3  # 구간 조회에 필요한 최대 compare 호출 수 (방향 확인, 역방향 재조회, 구간 파일 조회)
+
+
+class GitHubFetcher:
+    """
+    프로세스 전체에서 공유하는 HTTP/2 커넥션 풀 기반 GitHub 비동기 fetcher
+    - 호스트별 동시 요청 수 제한 (api.github.com, raw.githubusercontent.com 등)
+    - 502/503/504 및 네트워크 오류 시 지수 백오프 재시도
+    """
+
+    def __init__(self, config: GitHubFetcherConfig = GitHubFetcherConfig()):
+        self.config = config
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,  # raw_url은 raw.githubusercontent.com으로 리다이렉트됨
+                timeout=self.config.TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.config.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.config.MAX_PER_HOST)
+        return self._host_semaphores[host]
+
+    def request_pool(self) -> asyncio.Semaphore:
+        """요청 단위로 동시에 진행할 작업 수를 제한하는 세마포어"""
+        return asyncio.Semaphore(self.config.MAX_CONCURRENCY)
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """재시도를 포함한 GET 요청, 최종 응답이 4xx/5xx면 httpx.HTTPStatusError 발생"""
+        semaphore = self._host_semaphore(url)
+        for attempt in range(self.config.RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await self.client.get(url, headers=headers)
+                if response.status_code not in self.config.STATUS_FORCELIST or attempt == self.config.RETRIES:
+                    response.raise_for_status()
+                    return response
+            except httpx.TransportError:
+                if attempt == self.config.RETRIES:
+                    raise
+            await asyncio.sleep(self.config.BACKOFF_FACTOR * (2 ** attempt))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+github_fetcher = GitHubFetcher()
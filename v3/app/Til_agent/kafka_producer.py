@@ -0,0 +1,129 @@
+import logging
+import os
+import threading
+from collections import deque
+from typing import Optional
+
+from confluent_kafka import Producer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class KafkaProducerConfig:
+    BROKER: Optional[str] = os.getenv("KAFKA_BROKER_IP")
+    TOPIC: Optional[str] = os.getenv("KAFKA_TOPIC")
+    LINGER_MS: int = int(os.getenv("KAFKA_LINGER_MS", 20))
+    POLL_INTERVAL: float = float(os.getenv("KAFKA_POLL_INTERVAL", 0.1))
+    FLUSH_TIMEOUT: float = float(os.getenv("KAFKA_FLUSH_TIMEOUT", 5))
+    # 브로커 없이 메모리에 메시지를 쌓는 로컬 대체 브로커 (테스트/로컬 실행용)
+    USE_LOCAL_BROKER: bool = os.getenv("KAFKA_LOCAL_BROKER", "false").lower() == "true"
+
+
+class LocalBrokerProducer:
+    """confluent_kafka.Producer 와 같은 인터페이스로 메시지를 메모리에 보관하는 대체 producer"""
+
+    class Message:
+        def __init__(self, topic: str, key, value):
+            self._topic, self._key, self._value = topic, key, value
+
+        def topic(self):
+            return self._topic
+
+        def key(self):
+            return self._key
+
+        def value(self):
+            return self._value
+
+    def __init__(self):
+        self.messages: deque[LocalBrokerProducer.Message] = deque(maxlen=10000)
+        self._pending: list[tuple] = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic: str, key=None, value=None, on_delivery=None):
+        with self._lock:
+            self._pending.append((self.Message(topic, key, value), on_delivery))
+
+    def poll(self, timeout: float = 0) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for message, on_delivery in pending:
+            self.messages.append(message)
+            if on_delivery:
+                on_delivery(None, message)
+        return len(pending)
+
+    def flush(self, timeout: float = 0) -> int:
+        self.poll()
+        return 0
+
+
+class ProgressProducer:
+    """
+    프로세스당 하나만 생성되는 Kafka producer
+    - produce는 내부 큐에 넣고 바로 반환 (linger.ms 단위로 배치 전송)
+    - 백그라운드 스레드가 poll을 돌며 전송 결과 콜백 처리
+    - 종료 시 close()로 남은 메시지를 flush
+    """
+
+    def __init__(self, config: KafkaProducerConfig = KafkaProducerConfig()):
+        self.config = config
+        self._producer = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def producer(self):
+        with self._lock:
+            if self._producer is None:
+                if self.config.USE_LOCAL_BROKER:
+                    self._producer = LocalBrokerProducer()
+                else:
+                    self._producer = Producer({
+                        "bootstrap.servers": self.config.BROKER,
+                        "linger.ms": self.config.LINGER_MS,
+                    })
+                self._stop_event.clear()
+                self._poll_thread = threading.Thread(target=self._poll_loop, args=(self._producer,), name="kafka-poll", daemon=True)
+                self._poll_thread.start()
+            return self._producer
+
+    def _poll_loop(self, producer):
+        while not self._stop_event.is_set():
+            producer.poll(self.config.POLL_INTERVAL)
+            if isinstance(producer, LocalBrokerProducer):
+                self._stop_event.wait(self.config.POLL_INTERVAL)
+
+    @staticmethod
+    def _on_delivery(err, msg):
+        if err is not None:
+            logger.error(f"Kafka 전송 실패 (key={msg.key()}): {err}")
+
+    def produce(self, key: str, value: str):
+        producer = self.producer
+        try:
+            producer.produce(topic=self.config.TOPIC, key=key, value=value.encode("utf-8"), on_delivery=self._on_delivery)
+        except BufferError:
+            # 로컬 큐가 가득 찬 경우 전송을 조금 진행시킨 뒤 한 번 더 시도
+            producer.poll(0)
+            producer.produce(topic=self.config.TOPIC, key=key, value=value.encode("utf-8"), on_delivery=self._on_delivery)
+
+    def close(self):
+        with self._lock:
+            if self._producer is None:
+                return
+            self._stop_event.set()
+            if self._poll_thread is not None:
+                self._poll_thread.join(timeout=self.config.FLUSH_TIMEOUT)
+            remaining = self._producer.flush(self.config.FLUSH_TIMEOUT)
+            if remaining:
+                logger.warning(f"Kafka 종료 시 전송되지 않은 메시지 {remaining}건")
+            self._producer = None
+            self._poll_thread = None
+
+
+progress_producer = ProgressProducer()
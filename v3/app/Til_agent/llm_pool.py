@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+from langchain_openai import AzureChatOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class LLMPoolConfig:
+    MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30))
+    AZURE_API_VERSION: str = "2024-12-01-preview"
+
+
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_async_client(config: LLMPoolConfig = LLMPoolConfig()) -> httpx.AsyncClient:
+    """모든 LLM 클라이언트가 공유하는 keep-alive 커넥션 풀"""
+    global _http_async_client
+    if _http_async_client is None or _http_async_client.is_closed:
+        _http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.MAX_CONNECTIONS,
+                max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _http_async_client
+
+
+@lru_cache()
+def get_azure_chat_model(
+    azure_deployment: str,
+    temperature: float = 0,
+    max_tokens: int = 2048,
+    timeout: float = 30,
+    max_retries: int = 2,
+) -> AzureChatOpenAI:
+    """deployment와 파라미터 조합별로 한 번만 생성되는 AzureChatOpenAI"""
+    return AzureChatOpenAI(
+        azure_deployment=azure_deployment,
+        api_version=LLMPoolConfig.AZURE_API_VERSION,
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        max_retries=max_retries,
+        http_async_client=get_http_async_client(),
+        # 스트리밍(astream_events) 호출에서도 마지막 chunk로 토큰 사용량을 받아 RequestBudget이 집계
+        stream_usage=True,
+    )
+
+
+async def aclose_llm_clients():
+    """앱 종료 시 공유 커넥션 풀 정리"""
+    global _http_async_client
+    get_azure_chat_model.cache_clear()
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
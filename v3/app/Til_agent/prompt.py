@@ -315,4 +315,26 @@ INSTRUCTION_WRITER_INSTRUCTIONS = """Concept 부분이 작성되었습니다. 
 
 <본문 내용>
 {body}
-</본문 내용>"""
\ No newline at end of file
+</본문 내용>"""
+
+FINALIZE_INSTRUCTIONS = """당신은 커밋 보고서들을 기반으로 일일 학습 일지(Today I Learned: TIL)를 마무리하는 AI 작성자입니다.
+아래 본문 섹션을 모두 읽고 Concept, keywords, Introduction, Conclusion을 한 번에 작성하세요.
+
+<작성 형식>
+- concept: 오늘 새롭게 배운 개념을 자연스러운 **1인칭 회고 문체**로 정리합니다. 구체적으로 어떤 기술을 적용했고 무엇을 개선했는지 서술하세요.
+- keywords: 오늘 배운 개념의 핵심 키워드 3~5개 (예: Spring Security, BCryptPasswordEncoder, Spring Data JPA)
+- introduction: '오늘은 ~ 에 대해 배웠습니다.' 라는 문장으로 시작하는 학습 개요입니다. 단순 요약이 아니라 "무엇을 왜 개선했고, 어떻게 바뀌었는지"에 초점을 맞춥니다.
+- conclusion: Introduction과 본문 내용을 취합한 회고입니다. 본문 섹션을 정리하는 목록이나 표를 1개 포함하세요.
+- "이번 TIL에서는~", "이 커밋에서는~", 같은 표현은 사용하지 마세요.
+- 모든 내용은 무조건 한국어로 작성하세요.
+</작성 형식>
+
+<출력 예시>
+오늘은 사용자 인증 과정에서의 보안을 강화하기 위해 비밀번호 암호화 기능을 적용하고, 데이터베이스 접근 방식을 JPA 기반으로 개선했습니다.  
+`BCryptPasswordEncoder`를 활용해 비밀번호를 안전하게 저장하도록 변경했고, 기존의 JDBC 방식 대신 Spring Data JPA를 도입해 코드의 간결성과 유지보수성을 높였습니다.  
+불필요한 로그인 API도 정리하면서, 보안성과 가독성 측면 모두에서 개선할 수 있었던 작업이었습니다.
+</출력 예시>
+
+<본문 내용>
+{body}
+</본문 내용>"""
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import time
+
+
+class RateLimitConfig:
+    # 분당 허용 요청 수 (각 검색 제공자의 실제 quota에 맞춰 환경 변수로 조정)
+    TAVILY_PER_MINUTE: float = float(os.getenv("TAVILY_RATE_LIMIT_PER_MINUTE", 100))
+    TAVILY_BURST: float = float(os.getenv("TAVILY_RATE_LIMIT_BURST", 10))
+    GOOGLE_API_PER_MINUTE: float = float(os.getenv("GOOGLE_API_RATE_LIMIT_PER_MINUTE", 100))
+    GOOGLE_API_BURST: float = float(os.getenv("GOOGLE_API_RATE_LIMIT_BURST", 5))
+    GOOGLE_SCRAPE_PER_MINUTE: float = float(os.getenv("GOOGLE_SCRAPE_RATE_LIMIT_PER_MINUTE", 30))
+    GOOGLE_SCRAPE_BURST: float = float(os.getenv("GOOGLE_SCRAPE_RATE_LIMIT_BURST", 2))
+
+
+class AsyncTokenBucket:
+    """
+    비동기 token bucket rate limiter
+    - 토큰이 남아 있으면 바로 통과, 없으면 채워질 때까지 대기
+    - 대기자는 asyncio.Lock의 FIFO 순서로 처리되어 동시 요청 간에 공정하게 분배
+    """
+
+    def __init__(self, rate_per_minute: float, burst: float):
+        self.rate = rate_per_minute / 60.0  # 초당 토큰
+        self.capacity = max(burst, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+tavily_rate_limiter = AsyncTokenBucket(RateLimitConfig.TAVILY_PER_MINUTE, RateLimitConfig.TAVILY_BURST)
+google_api_rate_limiter = AsyncTokenBucket(RateLimitConfig.GOOGLE_API_PER_MINUTE, RateLimitConfig.GOOGLE_API_BURST)
+google_scrape_rate_limiter = AsyncTokenBucket(RateLimitConfig.GOOGLE_SCRAPE_PER_MINUTE, RateLimitConfig.GOOGLE_SCRAPE_BURST)
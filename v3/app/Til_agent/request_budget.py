@@ -0,0 +1,93 @@
+import os
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+
+
+class RequestBudgetConfig:
+    MAX_LLM_CALLS: int = int(os.getenv("TIL_MAX_LLM_CALLS", 40))
+    MAX_TOKENS: int = int(os.getenv("TIL_MAX_TOKENS", 200_000))
+    MAX_SEARCH_CALLS: int = int(os.getenv("TIL_MAX_SEARCH_CALLS", 20))
+    DEADLINE_SECONDS: float = float(os.getenv("TIL_DEADLINE_SECONDS", 180))
+
+
+class RequestBudget(BaseCallbackHandler):
+    """
+    TIL 요청 1건의 실행 예산
+    - LLM 호출 수 / 토큰 수: 콜백으로 모든 노드의 LLM 호출을 집계
+    - 검색 호출 수: 검색 도구 실행 전에 try_search()로 차감
+    - 마감 시각: 생성 시점 기준 DEADLINE_SECONDS
+    그래프 노드는 LLM 호출 전에 exhausted_reason()을 확인해 남은 결과로 마무리합니다.
+    """
+
+    run_inline = True
+
+    def __init__(
+        self,
+        max_llm_calls: int = RequestBudgetConfig.MAX_LLM_CALLS,
+        max_tokens: int = RequestBudgetConfig.MAX_TOKENS,
+        max_search_calls: int = RequestBudgetConfig.MAX_SEARCH_CALLS,
+        deadline_seconds: float = RequestBudgetConfig.DEADLINE_SECONDS,
+    ):
+        self.max_llm_calls = max_llm_calls
+        self.max_tokens = max_tokens
+        self.max_search_calls = max_search_calls
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + deadline_seconds
+        self.llm_calls = 0
+        self.tokens = 0
+        self.search_calls = 0
+        self.skipped_searches = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.llm_calls += 1
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        tokens = usage.get("total_tokens")
+        if tokens is None:
+            # 스트리밍 응답 등 llm_output이 없는 경우 메시지의 usage_metadata 사용
+            tokens = sum(
+                (getattr(generation, "message", None) and (generation.message.usage_metadata or {}).get("total_tokens")) or 0
+                for generations in response.generations
+                for generation in generations
+            )
+        self.tokens += tokens
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def exhausted_reason(self) -> Optional[str]:
+        if self.llm_calls >= self.max_llm_calls:
+            return f"LLM 호출 {self.llm_calls}/{self.max_llm_calls}회"
+        if self.tokens >= self.max_tokens:
+            return f"토큰 {self.tokens}/{self.max_tokens}"
+        if self.remaining_seconds() <= 0:
+            return f"마감 시간 {time.monotonic() - self.started_at:.0f}초 경과"
+        return None
+
+    def try_search(self, count: int = 1) -> bool:
+        """검색 count회를 차감, 예산이 부족하면 차감하지 않고 False"""
+        if self.search_calls + count > self.max_search_calls or self.exhausted_reason():
+            self.skipped_searches += count
+            return False
+        self.search_calls += count
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "tokens": self.tokens,
+            "search_calls": self.search_calls,
+            "skipped_searches": self.skipped_searches,
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 1),
+            "exhausted": self.exhausted_reason(),
+        }
+
+
+def get_request_budget(config: Optional[RunnableConfig]) -> Optional[RequestBudget]:
+    """그래프 실행 시 config["configurable"]["request_budget"]로 넘긴 요청별 예산"""
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("request_budget")
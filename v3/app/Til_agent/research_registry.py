@@ -0,0 +1,172 @@
+import asyncio
+import os
+import zlib
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+from langchain_core.runnables import RunnableConfig
+
+from .code_window import count_tokens
+
+EmbedFn = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+class ResearchRegistryConfig:
+    SIMILARITY_THRESHOLD: float = float(os.getenv("RESEARCH_DEDUP_SIMILARITY", 0.95))
+    SNIPPET_CHARS: int = 1000  # research_agent_tools에서 도구 메시지에 넣는 raw_content 길이
+    REFERENCE_CHARS: int = 200  # 다른 섹션과 중복된 결과는 이 길이의 요약만 전달
+    HASH_EMBEDDING_DIM: int = 512
+
+
+def normalize_url(url: str) -> str:
+    """scheme / 대소문자 / fragment / 끝의 '/' 차이를 없앤 URL"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", parts.netloc.lower().removeprefix("www."), path, parts.query, ""))
+
+
+def snippet_text(result: dict) -> str:
+    content = result.get("raw_content") or result.get("content") or ""
+    return f"{result.get('title', '')}\n{content[:ResearchRegistryConfig.SNIPPET_CHARS]}"
+
+
+def format_reference(result: dict) -> str:
+    """다른 섹션이 이미 수집한 결과를 대신하는 짧은 참조 (제목, URL, 수집한 섹션, 요약 앞부분)"""
+    summary = (result.get("content") or result.get("raw_content") or "")[:ResearchRegistryConfig.REFERENCE_CHARS]
+    return (
+        f"[{result.get('title', '')}]({result.get('url', '')}) "
+        f"- '{result.get('seen_in', '')}' 섹션에서 이미 수집한 자료: {summary}..."
+    )
+
+
+async def hash_embed(texts: list[str], dim: int = ResearchRegistryConfig.HASH_EMBEDDING_DIM) -> list[list[float]]:
+    """문자 3-gram 해싱 벡터 (임베딩 모델을 넘기지 않았을 때의 기본값, 거의 같은 스니펫 판별용)"""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        text = " ".join(text.lower().split())
+        for i in range(len(text) - 2):
+            vectors[row, zlib.crc32(text[i:i + 3].encode()) % dim] += 1.0
+    return vectors.tolist()
+
+
+class ResearchRegistry:
+    """
+    한 요청(TIL 1건) 동안 모든 research_team 분기가 공유하는 검색 결과 저장소
+    - 같은 검색어는 한 번만 요청하고 진행 중인 요청도 공유 (share)
+    - URL, 스니펫 임베딩 유사도로 결과를 처음 수집한 섹션을 기록 (register)
+      섹션 자신의 결과는 그대로 두고, 다른 섹션이 먼저 수집한 결과만 짧은 참조로 바꿀 수 있게 표시
+    - 참조로 바꾼 만큼 절약한 프롬프트 토큰 수 집계
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[EmbedFn] = None,
+        similarity_threshold: float = ResearchRegistryConfig.SIMILARITY_THRESHOLD,
+    ):
+        self.embed_fn = embed_fn or hash_embed
+        self.similarity_threshold = similarity_threshold
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._urls: dict[str, str] = {}  # 정규화한 URL -> 처음 수집한 섹션
+        self._vectors: Optional[np.ndarray] = None
+        self._vector_sections: list[str] = []  # _vectors 행별 수집한 섹션
+        self._lock = asyncio.Lock()
+        self.shared_fetches = 0
+        self.url_duplicates = 0
+        self.similar_duplicates = 0
+        self.saved_tokens = 0
+
+    async def share(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """key가 같은 요청은 먼저 시작한 요청의 결과를 함께 사용 (실패한 요청은 다음에 다시 시도)"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda f: self._inflight.pop(key, None) if f.cancelled() or f.exception() else None
+            )
+        else:
+            self.shared_fetches += 1
+        return await asyncio.shield(future)
+
+    async def _embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.asarray(await self.embed_fn(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    async def register(self, results: list[dict], section: str = "") -> tuple[list[dict], list[dict]]:
+        """
+        결과를 (section 자신의 결과, 다른 섹션이 먼저 수집한 결과)로 나누고 새 결과를 section 소유로 등록
+        다른 섹션의 결과에는 수집한 섹션 이름을 "seen_in"으로 붙여 반환합니다 (format_reference로 출력).
+        임베딩은 lock 밖에서 계산하고, lock은 비교 / 등록 단계에서만 잡습니다.
+        """
+        unseen = [result for result in results if normalize_url(result.get("url", "")) not in self._urls]
+        vectors = await self._embed([snippet_text(result) for result in unseen]) if unseen else []
+        unseen_vectors = {id(result): vector for result, vector in zip(unseen, vectors)}
+
+        async with self._lock:
+            own, references = [], []
+            for result in results:
+                url = normalize_url(result.get("url", ""))
+                owner = self._urls.get(url)
+                if owner is not None:
+                    if owner == section:
+                        if id(result) not in unseen_vectors:
+                            own.append(result)
+                        # 같은 응답 안에서 URL이 반복된 경우 첫 번째 결과만 사용
+                    else:
+                        self.url_duplicates += 1
+                        references.append({**result, "seen_in": owner})
+                    continue
+
+                vector = unseen_vectors.get(id(result))
+                if vector is None:
+                    continue
+                if self._vectors is not None:
+                    similarities = self._vectors @ vector
+                    best = int(np.argmax(similarities))
+                    owner = self._vector_sections[best]
+                    if similarities[best] >= self.similarity_threshold and owner != section:
+                        self.similar_duplicates += 1
+                        references.append({**result, "seen_in": owner})
+                        continue
+                self._urls[url] = section
+                self._vectors = vector[None, :] if self._vectors is None else np.vstack([self._vectors, vector])
+                self._vector_sections.append(section)
+                own.append(result)
+
+            return own, references
+
+    def record_saved_tokens(self, references: list[dict]):
+        """참조로 바꿔 실제로 프롬프트에서 줄어든 토큰 수 집계 (참조를 도구 메시지에 넣은 곳에서 호출)"""
+        self.saved_tokens += sum(
+            max(count_tokens(snippet_text(result)) - count_tokens(format_reference(result)), 0)
+            for result in references
+        )
+
+    def stats(self) -> dict:
+        return {
+            "unique_results": len(self._urls),
+            "shared_fetches": self.shared_fetches,
+            "url_duplicates": self.url_duplicates,
+            "similar_duplicates": self.similar_duplicates,
+            "saved_tokens": self.saved_tokens,
+        }
+
+
+def get_research_registry(config: Optional[RunnableConfig]) -> Optional[ResearchRegistry]:
+    """그래프 실행 시 config["configurable"]["research_registry"]로 넘긴 요청별 저장소"""
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("research_registry")
+
+
+def with_research_section(config: RunnableConfig, section: str) -> RunnableConfig:
+    """검색 도구가 결과를 어느 섹션 소유로 등록할지 알 수 있도록 config에 섹션 이름 추가"""
+    return {**config, "configurable": {**(config.get("configurable") or {}), "research_section": section}}
+
+
+def get_research_section(config: Optional[RunnableConfig]) -> str:
+    if not config:
+        return ""
+    return (config.get("configurable") or {}).get("research_section", "")
@@ -3,13 +3,26 @@ from tavily import AsyncTavilyClient
 from langchain_core.tools import tool
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import InjectedToolArg
-from typing import List, Annotated, Literal, cast
+from typing import List, Annotated, Literal, Optional, cast
 
-from .utils import get_config_value
+from .utils import get_config_value, get_config_flag, invoke_tool_calls
 from .config import MultiAgentConfiguration
 from .prompt import RESEARCH_INSTRUCTIONS
-from langchain_openai import AzureChatOpenAI
+from .search_cache import search_cache
+from .content_extraction import extract_page_content
+from .search_resources import search_resources
+from .research_registry import (
+    ResearchRegistry,
+    format_reference,
+    get_research_registry,
+    get_research_section,
+    with_research_section,
+)
+from .request_budget import get_request_budget
+from .rate_limiter import tavily_rate_limiter, google_api_rate_limiter, google_scrape_rate_limiter
+from .llm_pool import get_azure_chat_model
 from langgraph.graph import StateGraph, START, END
+from langchain_core.messages import AIMessage
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,15 +39,35 @@ import httpx
 import asyncio
 import os
 import random
-import time
-import requests
 from urllib.parse import unquote
 from bs4 import BeautifulSoup
-import concurrent.futures
-import aiohttp
+
+GOOGLE_SEARCH_API_URL = os.getenv("GOOGLE_SEARCH_API_URL", "https://www.googleapis.com/customsearch/v1")
+
+def parse_google_results(html: str) -> list[dict]:
+    """Google 검색 결과 페이지 HTML에서 (title, url, description) 추출"""
+    soup = BeautifulSoup(html, "html.parser")
+    search_results = []
+    for result in soup.find_all("div", class_="ezO2md"):
+        link_tag = result.find("a", href=True)
+        title_tag = link_tag.find("span", class_="CVA68e") if link_tag else None
+        description_tag = result.find("span", class_="FrIlee")
+        
+        if link_tag and title_tag and description_tag:
+            link = unquote(link_tag["href"].split("&")[0].replace("/url?q=", ""))
+            description = description_tag.text
+            # Store result in the same format as the API results
+            search_results.append({
+                "title": title_tag.text,
+                "url": link,
+                "content": description,
+                "score": None,
+                "raw_content": description
+            })
+    return search_results
 
 @tool(description="Google 검색 API를 사용하여 웹 검색을 수행합니다.")
-async def google_search_async(search_queries: Union[str, List[str]], max_results: int = 2, include_raw_content: bool = True):
+async def google_search_async(search_queries: Union[str, List[str]], max_results: int = 2, include_raw_content: bool = True, config: RunnableConfig = None):
     """
     Performs concurrent web searches using Google.
     Uses Google Custom Search API if environment variables are set, otherwise falls back to web scraping.
@@ -67,8 +100,8 @@ async def google_search_async(search_queries: Union[str, List[str]], max_results
         openssl_version = f"OpenSSL/{random.randint(1, 3)}.{random.randint(0, 4)}.{random.randint(0, 9)}"
         return f"{lynx_version} {libwww_version} {ssl_mm_version} {openssl_version}"
     
-    # Create executor for running synchronous operations
-    executor = None if use_api else concurrent.futures.ThreadPoolExecutor(max_workers=5)
+    # 앱 수명 동안 공유하는 세션 / 스레드 풀
+    session = search_resources.session
     
     # Use a semaphore to limit concurrent requests
     semaphore = asyncio.Semaphore(5 if use_api else 2)
@@ -93,29 +126,26 @@ async def google_search_async(search_queries: Union[str, List[str]], max_results
                             'num': num
                         }
                         print(f"Requesting {num} results for '{query}' from Google API...")
+                        await google_api_rate_limiter.acquire()
 
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get('https://www.googleapis.com/customsearch/v1', params=params) as response:
-                                if response.status != 200:
-                                    error_text = await response.text()
-                                    print(f"API error: {response.status}, {error_text}")
-                                    break
-                                    
-                                data = await response.json()
+                        async with session.get(GOOGLE_SEARCH_API_URL, params=params) as response:
+                            if response.status != 200:
+                                error_text = await response.text()
+                                print(f"API error: {response.status}, {error_text}")
+                                break
                                 
-                                # Process search results
-                                for item in data.get('items', []):
-                                    result = {
-                                        "title": item.get('title', ''),
-                                        "url": item.get('link', ''),
-                                        "content": item.get('snippet', ''),
-                                        "score": None,
-                                        "raw_content": item.get('snippet', '')
-                                    }
-                                    results.append(result)
-                        
-                        # Respect API quota with a small delay
-                        await asyncio.sleep(0.2)
+                            data = await response.json()
+                            
+                            # Process search results
+                            for item in data.get('items', []):
+                                result = {
+                                    "title": item.get('title', ''),
+                                    "url": item.get('link', ''),
+                                    "content": item.get('snippet', ''),
+                                    "score": None,
+                                    "raw_content": item.get('snippet', '')
+                                }
+                                results.append(result)
                         
                         # If we didn't get a full page of results, no need to request more
                         if not data.get('items') or len(data.get('items', [])) < num:
@@ -123,145 +153,98 @@ async def google_search_async(search_queries: Union[str, List[str]], max_results
                 
                 # Web scraping based search
                 else:
-                    # Add delay between requests
-                    await asyncio.sleep(0.5 + random.random() * 1.5)
                     print(f"Scraping Google for '{query}'...")
 
-                    # Define scraping function
-                    def google_search(query, max_results):
-                        try:
-                            lang = "en"
-                            safe = "active"
-                            start = 0
-                            fetched_results = 0
-                            fetched_links = set()
-                            search_results = []
-                            
-                            while fetched_results < max_results:
-                                # Send request to Google
-                                resp = requests.get(
-                                    url="https://www.google.com/search",
-                                    headers={
-                                        "User-Agent": get_useragent(),
-                                        "Accept": "*/*"
-                                    },
-                                    params={
-                                        "q": query,
-                                        "num": max_results + 2,
-                                        "hl": lang,
-                                        "start": start,
-                                        "safe": safe,
-                                    },
-                                    cookies = {
-                                        'CONSENT': 'PENDING+987',  # Bypasses the consent page
-                                        'SOCS': 'CAESHAgBEhIaAB',
-                                    }
-                                )
-                                resp.raise_for_status()
-                                
-                                # Parse results
-                                soup = BeautifulSoup(resp.text, "html.parser")
-                                result_block = soup.find_all("div", class_="ezO2md")
-                                new_results = 0
-                                
-                                for result in result_block:
-                                    link_tag = result.find("a", href=True)
-                                    title_tag = link_tag.find("span", class_="CVA68e") if link_tag else None
-                                    description_tag = result.find("span", class_="FrIlee")
-                                    
-                                    if link_tag and title_tag and description_tag:
-                                        link = unquote(link_tag["href"].split("&")[0].replace("/url?q=", ""))
-                                        
-                                        if link in fetched_links:
-                                            continue
-                                        
-                                        fetched_links.add(link)
-                                        title = title_tag.text
-                                        description = description_tag.text
-                                        
-                                        # Store result in the same format as the API results
-                                        search_results.append({
-                                            "title": title,
-                                            "url": link,
-                                            "content": description,
-                                            "score": None,
-                                            "raw_content": description
-                                        })
-                                        
-                                        fetched_results += 1
-                                        new_results += 1
-                                        
-                                        if fetched_results >= max_results:
-                                            break
-                                
-                                if new_results == 0:
-                                    break
-                                    
-                                start += 10
-                                time.sleep(1)  # Delay between pages
-                            
-                            return search_results
-                                
-                        except Exception as e:
-                            print(f"Error in Google search for '{query}': {str(e)}")
-                            return []
-                    
-                    # Execute search in thread pool
+                    lang = "en"
+                    safe = "active"
+                    start = 0
+                    fetched_links = set()
                     loop = asyncio.get_running_loop()
-                    search_results = await loop.run_in_executor(
-                        executor, 
-                        lambda: google_search(query, max_results)
-                    )
-                    
-                    # Process the results
-                    results = search_results
+
+                    while len(results) < max_results:
+                        # Respect scraping rate limit shared across requests (one token per page request)
+                        await google_scrape_rate_limiter.acquire()
+                        # Send request to Google
+                        async with session.get(
+                            "https://www.google.com/search",
+                            headers={
+                                "User-Agent": get_useragent(),
+                                "Accept": "*/*",
+                                # Bypasses the consent page
+                                "Cookie": "CONSENT=PENDING+987; SOCS=CAESHAgBEhIaAB",
+                            },
+                            params={
+                                "q": query,
+                                "num": str(max_results + 2),
+                                "hl": lang,
+                                "start": str(start),
+                                "safe": safe,
+                            },
+                        ) as resp:
+                            resp.raise_for_status()
+                            html = await resp.text()
+
+                        # Parse results in the shared thread pool
+                        page_results = await loop.run_in_executor(search_resources.executor, parse_google_results, html)
+                        new_results = 0
+
+                        for result in page_results:
+                            if result["url"] in fetched_links:
+                                continue
+                            fetched_links.add(result["url"])
+                            results.append(result)
+                            new_results += 1
+                            if len(results) >= max_results:
+                                break
+
+                        if new_results == 0:
+                            break
+
+                        start += 10
                 
                 # If requested, fetch full page content asynchronously (for both API and web scraping)
                 if include_raw_content and results:
                     content_semaphore = asyncio.Semaphore(3)
                     
-                    async with aiohttp.ClientSession() as session:
-                        fetch_tasks = []
-                        
-                        async def fetch_full_content(result):
-                            async with content_semaphore:
-                                url = result['url']
-                                headers = {
-                                    'User-Agent': get_useragent(),
-                                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-                                }
-                                
-                                try:
-                                    await asyncio.sleep(0.2 + random.random() * 0.6)
-                                    async with session.get(url, headers=headers, timeout=10) as response:
-                                        if response.status == 200:
-                                            # Check content type to handle binary files
-                                            content_type = response.headers.get('Content-Type', '').lower()
-                                            
-                                            # Handle PDFs and other binary files
-                                            if 'application/pdf' in content_type or 'application/octet-stream' in content_type:
-                                                # For PDFs, indicate that content is binary and not parsed
-                                                result['raw_content'] = f"[Binary content: {content_type}. Content extraction not supported for this file type.]"
-                                            else:
-                                                try:
-                                                    # Try to decode as UTF-8 with replacements for non-UTF8 characters
-                                                    html = await response.text(errors='replace')
-                                                    soup = BeautifulSoup(html, 'html.parser')
-                                                    result['raw_content'] = soup.get_text()
-                                                except UnicodeDecodeError as ude:
-                                                    # Fallback if we still have decoding issues
-                                                    result['raw_content'] = f"[Could not decode content: {str(ude)}]"
-                                except Exception as e:
-                                    print(f"Warning: Failed to fetch content for {url}: {str(e)}")
-                                    result['raw_content'] = f"[Error fetching content: {str(e)}]"
-                                return result
-                        
-                        for result in results:
-                            fetch_tasks.append(fetch_full_content(result))
-                        
-                        updated_results = await asyncio.gather(*fetch_tasks)
-                        results = updated_results
-                        print(f"Fetched full content for {len(results)} results")
+                    fetch_tasks = []
+                    
+                    async def fetch_full_content(result):
+                        async with content_semaphore:
+                            url = result['url']
+                            headers = {
+                                'User-Agent': get_useragent(),
+                                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+                            }
+                            
+                            try:
+                                await asyncio.sleep(0.2 + random.random() * 0.6)
+                                async with session.get(url, headers=headers, timeout=10) as response:
+                                    if response.status == 200:
+                                        # Check content type to handle binary files
+                                        content_type = response.headers.get('Content-Type', '').lower()
+                                        
+                                        # Handle PDFs and other binary files
+                                        if 'application/pdf' in content_type or 'application/octet-stream' in content_type:
+                                            # For PDFs, indicate that content is binary and not parsed
+                                            result['raw_content'] = f"[Binary content: {content_type}. Content extraction not supported for this file type.]"
+                                        else:
+                                            try:
+                                                # 크기 제한 스트리밍 + 워커 풀에서 본문 추출
+                                                result['raw_content'] = await extract_page_content(response)
+                                            except (UnicodeDecodeError, LookupError) as ude:
+                                                # Fallback if we still have decoding issues
+                                                result['raw_content'] = f"[Could not decode content: {str(ude)}]"
+                            except Exception as e:
+                                print(f"Warning: Failed to fetch content for {url}: {str(e)}")
+                                result['raw_content'] = f"[Error fetching content: {str(e)}]"
+                            return result
+                    
+                    for result in results:
+                        fetch_tasks.append(fetch_full_content(result))
+                    
+                    updated_results = await asyncio.gather(*fetch_tasks)
+                    results = updated_results
+                    print(f"Fetched full content for {len(results)} results")
                 
                 return {
                     "query": query,
@@ -280,21 +263,25 @@ async def google_search_async(search_queries: Union[str, List[str]], max_results
                     "results": []
                 }
 
-    try:
-        # Create tasks for all search queries
-        search_tasks = [search_single_query(query) for query in search_queries]
-        
-        # Execute all searches concurrently
-        search_results = await asyncio.gather(*search_tasks)
-        
-        return search_results
-    finally:
-        # Only shut down executor if it was created
-        if executor:
-            executor.shutdown(wait=False)
+    # 같은 요청의 다른 섹션이 이미 검색했거나 검색 중인 쿼리는 그 결과를 공유
+    registry = get_research_registry(config)
 
+    async def shared_search(query):
+        if registry is None:
+            return await search_single_query(query)
+        key = search_cache.make_key("google", query, max_results=max_results, include_raw_content=include_raw_content)
+        return await registry.share(key, lambda: search_single_query(query))
 
-async def tavily_search_async(search_queries, max_results: int = 5, topic: Literal["general", "news", "finance"] = "general", include_raw_content: bool = True):
+    # Create tasks for all search queries
+    search_tasks = [shared_search(query) for query in search_queries]
+    
+    # Execute all searches concurrently
+    search_results = await asyncio.gather(*search_tasks)
+    
+    return search_results
+
+
+async def tavily_search_async(search_queries, max_results: int = 5, topic: Literal["general", "news", "finance"] = "general", include_raw_content: bool = True, registry: Optional[ResearchRegistry] = None):
     """
     Tavily API를 사용하여 동시 웹 검색을 수행합니다.
 
@@ -303,6 +290,7 @@ async def tavily_search_async(search_queries, max_results: int = 5, topic: Liter
         max_results (int): 반환할 최대 결과 수
         topic (Literal["general", "news", "finance"]): 결과를 필터링할 주제
         include_raw_content (bool): 결과에 원시 콘텐츠를 포함할지 여부
+        registry (ResearchRegistry): 요청별 검색 결과 저장소 (있으면 섹션 간에 같은 쿼리 요청을 공유)
 
     Returns:
             List[dict]: Tavily API에서 반환된 검색 응답 목록:
@@ -324,21 +312,37 @@ async def tavily_search_async(search_queries, max_results: int = 5, topic: Liter
                 }
     """
     tavily_async_client = AsyncTavilyClient()
-    search_tasks = []
-    for query in search_queries:
-            search_tasks.append(
-                tavily_async_client.search(
-                    query,
-                    max_results=max_results,
-                    include_raw_content=include_raw_content,
-                    topic=topic
-                )
-            )
-            # 1초 대기
-            await asyncio.sleep(1)
+
+    # 정규화된 검색어 + 파라미터로 캐시 조회, 없는 쿼리만 Tavily 호출
+    cache_keys = [
+        search_cache.make_key("tavily", query, max_results=max_results, topic=topic, include_raw_content=include_raw_content)
+        for query in search_queries
+    ]
+    search_docs = [await search_cache.get(key) for key in cache_keys]
+    missing = [idx for idx, doc in enumerate(search_docs) if doc is None]
+
+    async def search_single_query(query):
+        # 공유 token bucket으로 Tavily quota 준수 (여유가 있으면 즉시 실행)
+        await tavily_rate_limiter.acquire()
+        return await tavily_async_client.search(
+            query,
+            max_results=max_results,
+            include_raw_content=include_raw_content,
+            topic=topic
+        )
+
+    async def shared_search(idx):
+        if registry is None:
+            return await search_single_query(search_queries[idx])
+        return await registry.share(cache_keys[idx], lambda: search_single_query(search_queries[idx]))
 
     # Execute all searches concurrently
-    search_docs = await asyncio.gather(*search_tasks)
+    fetched_docs = await asyncio.gather(*(shared_search(idx) for idx in missing))
+    for idx, doc in zip(missing, fetched_docs):
+        search_docs[idx] = doc
+        await search_cache.put(cache_keys[idx], doc)
+
+    print(f"[search cache] tavily {len(search_queries) - len(missing)}/{len(search_queries)} hit, {search_cache.stats()}")
     return search_docs
 
 TAVILY_SEARCH_DESCRIPTION = (
@@ -358,11 +362,13 @@ async def tavily_search(
     Tavily 검색 API에서 결과를 가져옵니다.
     """
     # try:
+    registry = get_research_registry(config)
     search_results = await tavily_search_async(
         search_queries=queries,
         max_results=max_results,
         topic=topic,
-        include_raw_content=True
+        include_raw_content=True,
+        registry=registry,
     )
     # Format the search results directly using the raw_content already provided
     formatted_output = "검색 결과:\n\n"
@@ -375,9 +381,20 @@ async def tavily_search(
             if url not in unique_results:
                 unique_results[url] = {**result, "query": response['query']}
 
+    references = []
+    if registry is not None:
+        # 다른 섹션이 이미 수집한 URL / 거의 같은 스니펫은 짧은 참조로 대체
+        own, references = await registry.register(list(unique_results.values()), get_research_section(config))
+        unique_results = {result['url']: result for result in own}
+
     for url, result in unique_results.items():
         formatted_output += f"- **{result['title']}**\n  {url}\n  {result['content'][:1000]}...\n\n"
         source_str += f"- **[{result['title']}]**({url})\n"
+    for result in references:
+        formatted_output += f"- {format_reference(result)}\n\n"
+    if references:
+        # 반환한 문자열이 도구 메시지로 그대로 전달되므로 참조로 줄인 만큼 절약
+        registry.record_saved_tokens(references)
 
     return formatted_output
 
@@ -429,17 +446,43 @@ async def get_research_tools(config: RunnableConfig) -> list[BaseTool]:
 
     return tools
 
+SEARCH_BUDGET_MESSAGE = "[검색 예산이 소진되어 검색을 건너뛰었습니다. 지금까지의 검색 결과로 보고서를 작성하세요.]"
+
+def fallback_commit_report(section) -> CommitReportSchema:
+    """웹 검색 없이 커밋 분석 결과만으로 만든 섹션 (예산 소진 시 사용)"""
+    section = section if isinstance(section, dict) else section.dict()
+    return CommitReportSchema(
+        filename=section["filename"],
+        research_keywords=[],
+        commit_report=section["code_review"],
+    )
+
+def count_search_rounds(messages: list, search_tool_names: set) -> int:
+    """검색 도구를 호출한 LLM 턴 수"""
+    return sum(
+        1 for message in messages
+        if any(tool_call["name"] in search_tool_names for tool_call in getattr(message, "tool_calls", None) or [])
+    )
+
 async def research_agent(state: ReportState, config: RunnableConfig):
     """LLM이 도구를 호출할지 여부를 결정합니다"""
     commit_analysis_result = state["section"]
     
     configurable = MultiAgentConfiguration.from_runnable_config(config)
     researcher_model = get_config_value(configurable.researcher_model)
+
+    # 요청 예산이 소진되면 LLM 호출 없이 지금까지의 결과(없으면 커밋 분석 결과)로 섹션을 마무리
+    budget = get_request_budget(config)
+    exhausted = budget.exhausted_reason() if budget is not None else None
+    if exhausted:
+        print(f"[budget] {commit_analysis_result['filename']} 연구 종료: {exhausted}")
+        state_update = {"messages": [AIMessage(content=f"예산 소진으로 연구를 종료합니다: {exhausted}")]}
+        if not state.get("completed_sections"):
+            state_update["completed_sections"] = [fallback_commit_report(commit_analysis_result)]
+        return state_update
     
-    llm = AzureChatOpenAI(
-        azure_deployment="gpt-4o-mini",  
-        api_version="2024-12-01-preview",
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    llm = get_azure_chat_model(
+        azure_deployment="gpt-4o-mini",
         temperature=0,
         max_tokens=2048,
         timeout=30,
@@ -447,6 +490,17 @@ async def research_agent(state: ReportState, config: RunnableConfig):
     )
 
     research_tool_list = await get_research_tools(config)
+
+    # search_iterations만큼 검색했다면 검색 도구를 빼고 보고서 작성 / 종료만 허용
+    search_tool_names = {
+        tool.name
+        for tool in research_tool_list
+        if tool.metadata is not None and tool.metadata.get("type") == "search"
+    }
+    max_search_iterations = state.get("search_iterations") or int(configurable.max_search_iterations)
+    if count_search_rounds(state.get("messages", []), search_tool_names) >= max_search_iterations:
+        research_tool_list = [tool for tool in research_tool_list if tool.name not in search_tool_names]
+
     system_prompt = RESEARCH_INSTRUCTIONS.format(
         code_review=commit_analysis_result["code_review"],
         number_of_query=configurable.number_of_queries,
@@ -462,7 +516,7 @@ async def research_agent(state: ReportState, config: RunnableConfig):
         "messages": [
             # Enforce tool calling to either perform more search or call the Section tool to write the section
             await llm.bind_tools(research_tool_list,             
-                                 parallel_tool_calls=False,
+                                 parallel_tool_calls=get_config_flag(configurable.parallel_tool_calls),
                                  # force at least one tool call
                                  tool_choice="any").ainvoke(
                 [
@@ -480,10 +534,11 @@ async def research_agent_tools(state: ReportState, config: RunnableConfig):
     """도구 호출을 수행하고 에이전트에게 전달하거나 연구 루프를 지속합니다"""
     configurable = MultiAgentConfiguration.from_runnable_config(config)
 
+    registry = get_research_registry(config)
+
     result = []
     completed_section = None
     source_str = ""
-    search_str = ""
     
     # Get tools based on configuration
     research_tool_list = await get_research_tools(config)
@@ -495,17 +550,39 @@ async def research_agent_tools(state: ReportState, config: RunnableConfig):
     }
     
     # Process all tool calls first (required for OpenAI)
-    for tool_call in state["messages"][-1].tool_calls:
-        # Get the tool
-        tool = research_tools_by_name[tool_call["name"]]
-        # Perform the tool call - use ainvoke for async tools
-        try:
-            observation = await tool.ainvoke(tool_call["args"], config)
-        except NotImplementedError:
-            observation = tool.invoke(tool_call["args"], config)
-
+    # parallel_tool_calls 모드에서는 동시에 실행하고, 결과는 tool_calls 순서대로 처리
+    tool_calls = state["messages"][-1].tool_calls
+
+    # 요청 예산의 검색 횟수(쿼리 수 기준)를 넘는 검색 호출은 실행하지 않음
+    budget = get_request_budget(config)
+    skipped_ids = set()
+    for tool_call in tool_calls:
+        if tool_call["name"] in search_tool_names and budget is not None:
+            queries = tool_call["args"].get("queries") or tool_call["args"].get("search_queries") or []
+            if not budget.try_search(len(queries) if isinstance(queries, list) else 1):
+                skipped_ids.add(tool_call["id"])
+
+    # 검색 결과를 이 섹션 소유로 등록하도록 섹션 이름을 함께 전달
+    section = state["section"]
+    section_name = section["filename"] if isinstance(section, dict) else section.filename
+    executed = iter(await invoke_tool_calls(
+        [tool_call for tool_call in tool_calls if tool_call["id"] not in skipped_ids],
+        research_tools_by_name,
+        with_research_section(config, section_name),
+        max_concurrency=int(configurable.max_tool_concurrency) if get_config_flag(configurable.parallel_tool_calls) else 1,
+    ))
+
+    for tool_call in tool_calls:
+        if tool_call["id"] in skipped_ids:
+            result.append({"role": "tool",
+                           "content": SEARCH_BUDGET_MESSAGE,
+                           "name": tool_call["name"],
+                           "tool_call_id": tool_call["id"]})
+            continue
+        observation = next(executed)
+        # 도구 메시지에는 이 호출의 결과만 담음 (같은 턴의 다른 호출 결과를 반복하지 않음)
+        search_str = ""
 
-        
         # Store the section observation if a Section tool was called
         if tool_call["name"] == "CommitReportSchema":
             completed_section = cast(CommitReportSchema, observation)
@@ -518,11 +595,24 @@ async def research_agent_tools(state: ReportState, config: RunnableConfig):
                 # List of responses
                 for response in observation:
                     query = response.get("query", "")
-                    for data in response.get("results", []):
+                    results = response.get("results", [])
+                    references = []
+                    if registry is not None:
+                        # 다른 섹션이 이미 수집한 URL / 거의 같은 스니펫은 짧은 참조로 대체
+                        results, references = await registry.register(results, section_name)
+                    for data in results:
                         source_str += (f"- [{data.get('title', '')}]({data.get('url', '')})\n\n")
                         search_str += (f"[{data.get('title', '')}]\n\n({data.get('raw_content', '')[:1000]}...)\n\n")
+                    for data in references:
+                        source_str += (f"- [{data.get('title', '')}]({data.get('url', '')})\n\n")
+                        search_str += f"{format_reference(data)}\n\n"
+                    if references:
+                        registry.record_saved_tokens(references)
             elif isinstance(observation, str):
                 source_str += cast(str, observation)
+        if tool_call["name"] in search_tool_names and isinstance(observation, str):
+            # tavily_search처럼 포맷된 문자열을 반환하는 검색 도구는 (중복 결과를 참조로 바꾼) 결과를 그대로 전달
+            search_str = observation
         
                 # Append to messages 
         result.append({"role": "tool", 
@@ -546,11 +636,21 @@ async def research_agent_should_continue(state: ReportState) -> str:
     messages = state["messages"]
     last_message = messages[-1]
 
-    if last_message.tool_calls[0]["name"] == "FinishResearch":
+    if all(tool_call["name"] == "FinishResearch" for tool_call in last_message.tool_calls):
         # Research is done - return to supervisor
         return END
     else:
         return "research_agent_tools"
+
+async def research_agent_tools_should_continue(state: ReportState) -> str:
+    """병렬 도구 호출에 FinishResearch가 함께 포함되어 있었다면 다른 도구 실행 후 연구를 종료합니다."""
+
+    last_ai_message = next(
+        message for message in reversed(state["messages"]) if getattr(message, "tool_calls", None)
+    )
+    if any(tool_call["name"] == "FinishResearch" for tool_call in last_ai_message.tool_calls):
+        return END
+    return "research_agent"
     
 
 research_builder = StateGraph(ReportState, output=ReportOutputState, config_schema=MultiAgentConfiguration)
@@ -562,6 +662,10 @@ research_builder.add_conditional_edges(
     research_agent_should_continue,
     ["research_agent_tools", END]
 )
-research_builder.add_edge("research_agent_tools", "research_agent")
+research_builder.add_conditional_edges(
+    "research_agent_tools",
+    research_agent_tools_should_continue,
+    ["research_agent", END]
+)
 
 research_builder = research_builder.compile()
\ No newline at end of file
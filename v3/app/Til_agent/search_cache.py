@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+
+class SearchCacheConfig:
+    TTL_SECONDS: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", 24 * 60 * 60))
+    MAX_MEMORY_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024))
+    # 설정 시 SQLite 파일에 2차 캐시를 둠 (프로세스/워커 간 공유, 재시작 후에도 유지)
+    SQLITE_PATH: Optional[str] = os.getenv("SEARCH_CACHE_SQLITE_PATH")
+    MAX_SQLITE_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_SQLITE_ENTRIES", 20000))
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 유니코드 표기, 공백, 앞뒤 문장부호 차이를 없앤 검색어"""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"[\"'`“”‘’?!.,;:()\[\]{}]", " ", query)
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class SearchCache:
+    """
+    검색 결과 캐시
+    - 키: 정규화된 검색어 + 검색 파라미터 (max_results, topic 등)
+    - 메모리 TTL/LRU 캐시 + 선택적 SQLite 캐시
+    """
+
+    def __init__(self, config: SearchCacheConfig = SearchCacheConfig()):
+        self.config = config
+        self._memory = TTLCache(maxsize=config.MAX_MEMORY_ENTRIES, ttl=config.TTL_SECONDS)
+        self._lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if config.SQLITE_PATH:
+            self._init_sqlite(config.SQLITE_PATH)
+
+    def _init_sqlite(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._sqlite = sqlite3.connect(path, check_same_thread=False)
+        self._sqlite.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._sqlite.commit()
+
+    @staticmethod
+    def make_key(provider: str, query: str, **params) -> str:
+        param_str = json.dumps(params, sort_keys=True, default=str)
+        return f"{provider}|{normalize_query(query)}|{param_str}"
+
+    def _sqlite_get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._sqlite.execute(
+                "SELECT value FROM search_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._sqlite.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._sqlite.commit()
+        return json.loads(row[0])
+
+    def _sqlite_put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._sqlite.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.config.TTL_SECONDS, now),
+            )
+            self._sqlite.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            # 가장 오래 사용되지 않은 항목부터 정리
+            self._sqlite.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.config.MAX_SQLITE_ENTRIES,),
+            )
+            self._sqlite.commit()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._memory.get(key)
+        if value is None and self._sqlite is not None:
+            value = await asyncio.to_thread(self._sqlite_get, key)
+            if value is not None:
+                self._memory[key] = value
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def put(self, key: str, value: Any):
+        self._memory[key] = value
+        if self._sqlite is not None:
+            await asyncio.to_thread(self._sqlite_put, key, value)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+search_cache = SearchCache()
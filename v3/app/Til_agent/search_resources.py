@@ -0,0 +1,69 @@
+import os
+import concurrent.futures
+from typing import Optional
+
+import aiohttp
+
+
+class SearchResourcesConfig:
+    MAX_CONNECTIONS: int = int(os.getenv("SEARCH_MAX_CONNECTIONS", 100))
+    MAX_PER_HOST: int = int(os.getenv("SEARCH_MAX_PER_HOST", 10))
+    DNS_CACHE_TTL: int = int(os.getenv("SEARCH_DNS_CACHE_TTL", 300))
+    KEEPALIVE_TIMEOUT: float = float(os.getenv("SEARCH_KEEPALIVE_TIMEOUT", 30))
+    TIMEOUT: float = float(os.getenv("SEARCH_TIMEOUT", 30))
+    WORKERS: int = int(os.getenv("SEARCH_WORKERS", 4))
+
+
+class SearchResources:
+    """
+    검색 도구가 앱 수명 동안 공유하는 자원
+    - aiohttp 세션: 커넥션 풀, DNS 캐시, keep-alive
+    - 스레드 풀: HTML 파싱 등 CPU 작업
+    FastAPI startup / shutdown 에서 startup(), shutdown() 호출
+    """
+
+    def __init__(self, config: SearchResourcesConfig = SearchResourcesConfig()):
+        self.config = config
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    async def startup(self):
+        self.session
+        self.executor
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # startup 전에 사용되는 경우(스크립트, 노트북 등)에는 처음 사용할 때 생성
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.MAX_CONNECTIONS,
+                limit_per_host=self.config.MAX_PER_HOST,
+                ttl_dns_cache=self.config.DNS_CACHE_TTL,
+                keepalive_timeout=self.config.KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.TIMEOUT),
+                cookie_jar=aiohttp.DummyCookieJar(),  # 요청 간 쿠키 공유 방지
+            )
+        return self._session
+
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.config.WORKERS,
+                thread_name_prefix="search-worker",
+            )
+        return self._executor
+
+    async def shutdown(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+search_resources = SearchResources()
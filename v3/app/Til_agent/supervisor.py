@@ -6,8 +6,8 @@ from langgraph.types import Command,Send
 from .config import MultiAgentConfiguration
 from typing import cast, Literal
 from langchain_core.tools import tool
-from .utils import get_config_value
-from langchain_openai import AzureChatOpenAI
+from .utils import get_config_value, get_config_flag, invoke_tool_calls
+from .llm_pool import get_azure_chat_model
 from pydantic import BaseModel
 from .agent_schema import (
     CommitDataSchema,
@@ -18,12 +18,16 @@ from .agent_schema import (
     FinishReport,
     TilState,
     Concept,
+    FinalizeReport,
 )
 from dotenv import load_dotenv
 from .utils import kafka_produce
-from .prompt import SUPERVISOR_INSTRUCTIONS, INSTRUCTION_WRITER_INSTRUCTIONS
-from .research_team_agent import research_builder, get_search_tool
+from .prompt import SUPERVISOR_INSTRUCTIONS, INSTRUCTION_WRITER_INSTRUCTIONS, FINALIZE_INSTRUCTIONS
+from .research_team_agent import research_builder, get_search_tool, fallback_commit_report
+from .request_budget import get_request_budget
+from langchain_core.messages import AIMessage
 from .commit_analyze_graph import CommitAnalysisGraph
+from .supervisor_context import build_supervisor_context, split_turns
 from langfuse.langchain import CallbackHandler
 
 load_dotenv()
@@ -37,25 +41,23 @@ async def get_supervisor_tools(config: RunnableConfig) -> list[BaseTool]:
 async def supervisor(state: TilState, config: RunnableConfig):
     """LLM이 도구를 호출할지 여부를 결정합니다"""
 
-    messages = state["messages"]
-
     configurable = MultiAgentConfiguration.from_runnable_config(config)
     supervisor_model = get_config_value(configurable.supervisor_model)
 
-    llm = AzureChatOpenAI(
-        azure_deployment="gpt-4o-mini",  
-        api_version="2024-12-01-preview",
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    # 요청 예산이 소진되면 LLM 호출 없이 지금까지의 섹션으로 보고서를 마무리하고 종료
+    budget = get_request_budget(config)
+    exhausted = budget.exhausted_reason() if budget is not None else None
+    if exhausted:
+        return finish_with_available_sections(state, exhausted)
+
+    llm = get_azure_chat_model(
+        azure_deployment="gpt-4o-mini",
         temperature=0,
         max_tokens=2048,
         timeout=30,
         max_retries=2,
     )
     
-    if state.get("completed_sections") and not state.get("final_report"):
-        research_complete_message = {"role": "user", "content": "연구가 완료되었습니다. 이제 Concept, Introduction, Conclusion을 작성하세요. 완성된 본문 섹션은 다음과 같습니다 \n\n" + "\n\n".join([s.commit_report for s in state["completed_sections"]])}
-        messages = messages + [research_complete_message]
-
     supervisor_tool_list = await get_supervisor_tools(config)
     
     
@@ -63,28 +65,46 @@ async def supervisor(state: TilState, config: RunnableConfig):
         llm
         .bind_tools(
             supervisor_tool_list,
-            parallel_tool_calls=False,
+            parallel_tool_calls=get_config_flag(configurable.parallel_tool_calls),
             # 적어도 한개의 도구 호출을 강제합니다
             tool_choice="any"
         )
     )
 
-    system_prompt = SUPERVISOR_INSTRUCTIONS
+    # 오래된 도구 턴은 요약으로 압축하고 본문 섹션은 한 번만 전달
+    context = build_supervisor_context(
+        SUPERVISOR_INSTRUCTIONS,
+        state,
+        keep_turns=int(configurable.supervisor_context_turns),
+    )
+    print(
+        f"[supervisor context] turn={len(split_turns(state['messages'])[1]) + 1}, "
+        f"prompt_tokens={context.prompt_tokens}/{context.full_tokens}, saved={context.saved_tokens}, "
+        f"summarized_turns={context.summarized_turns}"
+    )
 
     return {
         "messages": [
-            await llm_with_tools.ainvoke(
-                [
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    }
-                ]
-                + messages
-            )
+            await llm_with_tools.ainvoke(context.messages)
         ]
     }
 
+def get_pending_sections(state: TilState) -> list:
+    """아직 research_team 결과가 없는 섹션"""
+    completed_filenames = {
+        os.path.basename(s["filename"] if isinstance(s, dict) else s.filename)
+        for s in state.get("completed_sections", [])
+    }
+    return [
+        s for s in state["sections"]
+        if os.path.basename(s["filename"] if isinstance(s, dict) else s.filename) not in completed_filenames
+    ]
+
+def assemble_report(date: str, intro: str, completed_sections: list, conclusion: str) -> str:
+    """개요, 본문 섹션, 회고를 최종 TIL 마크다운으로 조합"""
+    body_sections = "\n\n".join(f"# {s.filename}\n\n{s.commit_report}\n\n---" for s in completed_sections)
+    return f"# 📅 {date} TIL\n\n{intro}\n\n{body_sections}\n# 회고\n{conclusion}"
+
 async def supervisor_tools(state: TilState, config: RunnableConfig)  -> Command[Literal["supervisor", "research_team", "__end__"]]:
     """도구 호출을 수행하고 research_team 에게 전달합니다."""
     configurable = MultiAgentConfiguration.from_runnable_config(config)
@@ -115,13 +135,15 @@ async def supervisor_tools(state: TilState, config: RunnableConfig)  -> Command[
         if tool.metadata is not None and tool.metadata.get("type") == "search"
     }
 
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = supervisor_tools_by_name[tool_call["name"]]
-        try:
-            observation = await tool.ainvoke(tool_call["args"], config)
-        except NotImplementedError:
-            observation = tool.invoke(tool_call["args"], config)
+    tool_calls = state["messages"][-1].tool_calls
+    observations = await invoke_tool_calls(
+        tool_calls,
+        supervisor_tools_by_name,
+        config,
+        max_concurrency=int(configurable.max_tool_concurrency) if get_config_flag(configurable.parallel_tool_calls) else 1,
+    )
 
+    for tool_call, observation in zip(tool_calls, observations):
         result.append({"role": "tool", 
                        "content": observation, 
                        "name": tool_call["name"], 
@@ -145,15 +167,7 @@ async def supervisor_tools(state: TilState, config: RunnableConfig)  -> Command[
         elif tool_call["name"] in search_tool_names and configurable.include_source_str:
             source_str += cast(str, observation)
 
-    completed_filenames = {
-        os.path.basename(s["filename"] if isinstance(s, dict) else s.filename)
-        for s in state.get("completed_sections", [])
-    }
-
-    pending_sections = [
-        s for s in state["sections"]
-        if os.path.basename(s["filename"] if isinstance(s, dict) else s.filename) not in completed_filenames
-    ]
+    pending_sections = get_pending_sections(state)
 
     if pending_sections:
         if state["requestId"] is not None:
@@ -164,38 +178,33 @@ async def supervisor_tools(state: TilState, config: RunnableConfig)  -> Command[
                 for s in pending_sections
             ],
             update={"messages": result})
-    elif concept_content:
-        body = "\n\n".join(f"## {s.filename}\n\n{s.commit_report}" for s in state["completed_sections"])
-        result.append({"role": "user", "content": INSTRUCTION_WRITER_INSTRUCTIONS.format(body=body)})
-        state_update = {
-            "concept": concept_content,
-            "keywords": concept_keywords,
-            "messages": result,
-        }
-    elif intro_content:
-        if state["requestId"] is not None:
-            kafka_produce(state["requestId"], "INTRODUCTION_START")
-        result.append({"role": "user", "content": "Introduction 작성이 완료되었습니다. 이제 결론 부분을 작성합니다."})
-        state_update = {
-            "final_report": intro_content,
-            "messages": result,
-        }
-    elif conclusion_content:
-        if state["requestId"] is not None:
-            kafka_produce(state["requestId"], "CONCLUSION_START")
-        intro = state.get("final_report", "")
-        body_sections = "\n\n".join(f"# {s.filename}\n\n{s.commit_report}\n\n---" for s in state["completed_sections"])
-        
-        # 최종 보고서 조합
-        complete_report = f"# 📅 {state.get('date', '')} TIL\n\n{intro}\n\n{body_sections}\n# 회고\n{conclusion_content}"
-        
-        # 완료 메시지 추가
-        result.append({"role": "user", "content": "TIL(Today I Leared)의 개요, 본문 섹션, 회고 부분이 작성 완료되었습니다."})
-
-        state_update = {
-            "final_report": complete_report,
-            "messages": result,
-        }
+    elif concept_content or intro_content or conclusion_content:
+        # 병렬 도구 호출 시 Concept / Introduction / Conclusion이 한 번에 올 수 있으므로 모두 반영
+        state_update = {"messages": result}
+        if concept_content:
+            state_update["concept"] = concept_content
+            state_update["keywords"] = concept_keywords
+        if intro_content:
+            if state["requestId"] is not None:
+                kafka_produce(state["requestId"], "INTRODUCTION_START")
+            state_update["final_report"] = intro_content
+
+        if conclusion_content:
+            if state["requestId"] is not None:
+                kafka_produce(state["requestId"], "CONCLUSION_START")
+            intro = intro_content or state.get("final_report", "")
+            
+            # 최종 보고서 조합
+            complete_report = assemble_report(state.get("date", ""), intro, state["completed_sections"], conclusion_content)
+            
+            # 완료 메시지 추가
+            result.append({"role": "user", "content": "TIL(Today I Leared)의 개요, 본문 섹션, 회고 부분이 작성 완료되었습니다."})
+            state_update["final_report"] = complete_report
+        elif intro_content:
+            result.append({"role": "user", "content": "Introduction 작성이 완료되었습니다. 이제 결론 부분을 작성합니다."})
+        else:
+            body = "\n\n".join(f"## {s.filename}\n\n{s.commit_report}" for s in state["completed_sections"])
+            result.append({"role": "user", "content": INSTRUCTION_WRITER_INSTRUCTIONS.format(body=body)})
     else:
         # 기본 케이스 (검색 도구 등)
         state_update = {"messages": result}
@@ -206,6 +215,92 @@ async def supervisor_tools(state: TilState, config: RunnableConfig)  -> Command[
 
     return Command(goto="supervisor", update=state_update)
 
+def finish_with_available_sections(state: TilState, reason: str) -> dict:
+    """
+    예산 소진 시 상태 업데이트
+    - 완료된 섹션 + (연구 결과가 없는 섹션은) 커밋 분석 결과로 본문을 조합
+    - 이미 작성된 Introduction이 있으면 사용, Conclusion까지 끝났으면 보고서를 그대로 둠
+    - 도구 호출이 없는 AI 메시지로 supervisor 루프를 종료
+    """
+    print(f"[budget] 남은 섹션으로 TIL 마무리: {reason}")
+    state_update = {"messages": [AIMessage(content=f"예산 소진으로 보고서를 마무리합니다: {reason}")]}
+
+    concluded = any(
+        tool_call["name"] == "Conclusion"
+        for message in state["messages"]
+        for tool_call in getattr(message, "tool_calls", None) or []
+    )
+    if concluded:
+        return state_update
+
+    sections = list(state.get("completed_sections") or []) + [
+        fallback_commit_report(s) for s in get_pending_sections(state)
+    ]
+    keywords = state.get("keywords") or list(dict.fromkeys(
+        keyword for s in sections for keyword in s.research_keywords
+    ))
+    state_update["final_report"] = assemble_report(state.get("date", ""), state.get("final_report") or "", sections, "")
+    state_update["keywords"] = keywords
+    return state_update
+
+async def finalize_report(state: TilState, config: RunnableConfig) -> Command[Literal["supervisor", "__end__"]]:
+    """single-shot finalize: 구조화 출력 한 번으로 Concept / Introduction / Conclusion을 작성하고 보고서를 조합합니다."""
+    budget = get_request_budget(config)
+    exhausted = budget.exhausted_reason() if budget is not None else None
+    if exhausted:
+        return Command(goto=END, update=finish_with_available_sections(state, exhausted))
+
+    llm = get_azure_chat_model(
+        azure_deployment="gpt-4o-mini",
+        temperature=0,
+        max_tokens=4096,
+        timeout=60,
+        max_retries=2,
+    )
+
+    if state["requestId"] is not None:
+        kafka_produce(state["requestId"], "INTRODUCTION_START")
+
+    body = "\n\n".join(f"## {s.filename}\n\n{s.commit_report}" for s in state["completed_sections"])
+    try:
+        finalized = await llm.with_structured_output(FinalizeReport).ainvoke(
+            [{"role": "system", "content": FINALIZE_INSTRUCTIONS.format(body=body)}]
+        )
+    except Exception as e:
+        # 실패 시 단계별 supervisor 루프로 진행
+        print(f"[finalize] single-shot 실패, supervisor 단계별 작성으로 전환: {e}")
+        return Command(goto="supervisor")
+
+    if state["requestId"] is not None:
+        kafka_produce(state["requestId"], "CONCLUSION_START")
+
+    return Command(
+        goto=END,
+        update={
+            "concept": finalized.concept,
+            "keywords": finalized.keywords,
+            "final_report": assemble_report(
+                state.get("date", ""), finalized.introduction, state["completed_sections"], finalized.conclusion
+            ),
+        },
+    )
+
+async def collect_research(state: TilState) -> dict:
+    """
+    research_team fan-in 지점
+    Send로 나뉜 research_team 분기는 각자 자신의 completed_sections만 보므로, 모든 분기가 끝나고
+    결과가 합쳐진 뒤 이 노드에서 한 번만 다음 단계를 결정합니다 (route_after_research).
+    """
+    return {}
+
+async def route_after_research(state: TilState, config: RunnableConfig) -> str:
+    """연구가 끝나면 single_shot_finalize 설정에 따라 finalize_report 또는 supervisor로 이동"""
+    configurable = MultiAgentConfiguration.from_runnable_config(config)
+    # 결과가 빠진 섹션이 있으면 supervisor가 다시 research_team에 전달
+    if get_config_flag(configurable.single_shot_finalize) and not state.get("final_report") and not get_pending_sections(state):
+        return "finalize_report"
+    return "supervisor"
+
 async def supervisor_should_continue(state: TilState) -> str:
     """LLM이 도구 호출을 했는지 여부에 따라 루프를 계속할지 중지할지 결정합니다"""
 
@@ -221,17 +316,18 @@ async def supervisor_should_continue(state: TilState) -> str:
 
 # Supervisor workflow
 class SupervisorGraph:
-    def __init__(self, no_files: int):
-        self.no_files = no_files
-        self.commit_analysis_graph = CommitAnalysisGraph(no_files=no_files).make_commit_analysis_graph()
+    def __init__(self):
+        self.commit_analysis_graph = CommitAnalysisGraph().make_commit_analysis_graph()
         self.langfuse_handler = CallbackHandler()
 
-    async def make_supervisor_graph(self):
+    def make_supervisor_graph(self):
         supervisor_builder = StateGraph(input=CommitDataSchema, output=TilStateOutput, config_schema=MultiAgentConfiguration)
         supervisor_builder.add_node("supervisor", supervisor)
         supervisor_builder.add_node("supervisor_tools", supervisor_tools)
         supervisor_builder.add_node("commit_analysis_graph", self.commit_analysis_graph)
         supervisor_builder.add_node("research_team", research_builder)
+        supervisor_builder.add_node("collect_research", collect_research)
+        supervisor_builder.add_node("finalize_report", finalize_report)
 
         # Flow of the supervisor agent
         supervisor_builder.add_edge(START, "commit_analysis_graph")
@@ -241,7 +337,13 @@ class SupervisorGraph:
             supervisor_should_continue,
             ["supervisor_tools", END]
         )
-        supervisor_builder.add_edge("research_team", "supervisor")
+        # 모든 research_team 분기의 결과를 모은 뒤 한 번만 라우팅
+        supervisor_builder.add_edge("research_team", "collect_research")
+        supervisor_builder.add_conditional_edges(
+            "collect_research",
+            route_after_research,
+            ["finalize_report", "supervisor"]
+        )
 
         graph = supervisor_builder.compile().with_config(
             config={
@@ -249,4 +351,4 @@ class SupervisorGraph:
             }
         )
 
-        return graph
\ No newline at end of file
+        return graph
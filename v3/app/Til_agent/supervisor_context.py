@@ -0,0 +1,125 @@
+import json
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, convert_to_messages
+
+from .code_window import count_tokens
+
+RESEARCH_COMPLETE_MESSAGE = "연구가 완료되었습니다. 이제 Concept, Introduction, Conclusion을 작성하세요. 완성된 본문 섹션은 다음과 같습니다 \n\n"
+SUMMARY_FIELD_CHARS = 300  # 요약 줄에 남길 도구 인자(개념 정리, 작성 지시) 길이
+
+
+@dataclass
+class SupervisorContext:
+    """supervisor LLM에 실제로 보낼 메시지와 토큰 통계"""
+    messages: list[BaseMessage]
+    full_tokens: int  # 전체 히스토리를 그대로 보냈을 때의 프롬프트 토큰
+    prompt_tokens: int  # 압축 후 프롬프트 토큰
+    summarized_turns: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_tokens - self.prompt_tokens
+
+
+def _field(obj, key: str, default=None):
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+def message_text(message: BaseMessage) -> str:
+    """토큰 계산용 텍스트 (content + 도구 호출 인자)"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+    tool_calls = getattr(message, "tool_calls", None) or []
+    return content + "".join(
+        tool_call["name"] + json.dumps(tool_call["args"], ensure_ascii=False) for tool_call in tool_calls
+    )
+
+
+def count_message_tokens(messages: list[BaseMessage]) -> int:
+    return sum(count_tokens(message_text(message)) for message in messages)
+
+
+def split_turns(messages: list[BaseMessage]) -> tuple[list[BaseMessage], list[list[BaseMessage]]]:
+    """도구 호출 AI 메시지를 기준으로 (첫 AI 메시지 이전 메시지, 턴 목록)으로 나눔"""
+    prefix, turns = [], []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        else:
+            prefix.append(message)
+    return prefix, turns
+
+
+def _truncate(text: str, limit: int = SUMMARY_FIELD_CHARS) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def summarize_turns(turns: list[list[BaseMessage]], state: dict) -> list[str]:
+    """오래된 도구 턴을 결과 위주의 요약으로 변환 (개념 정리와 작성 지시는 앞부분을 남김)"""
+    lines = []
+    for turn in turns:
+        for tool_call in turn[0].tool_calls:
+            name = tool_call["name"]
+            args = tool_call["args"]
+            if name == "Sections":
+                lines.append(f"- Sections: {len(state.get('sections') or [])}개 섹션을 research_team에 전달")
+            elif name == "Concept":
+                keywords = ", ".join(args.get("keywords") or [])
+                lines.append(f"- Concept: 작성 완료 (키워드: {keywords})\n  개념 정리: {_truncate(args.get('concept'))}")
+            elif name in ("Introduction", "Conclusion"):
+                lines.append(f"- {name}: 작성 완료 (제목: {args.get('name', '')})\n  작성 내용: {_truncate(args.get('content'))}")
+            else:
+                lines.append(f"- {name}: 호출 완료")
+    return lines
+
+
+def build_supervisor_context(system_prompt: str, state: dict, keep_turns: int = 1) -> SupervisorContext:
+    """
+    supervisor 프롬프트 구성
+    - 최근 keep_turns개 도구 턴은 그대로, 그 이전 턴은 요약 한 블록으로 압축 (keep_turns <= 0 이면 압축하지 않음)
+    - 본문 섹션, Introduction은 남은 메시지에 없을 때만 한 번 포함
+    """
+    messages = convert_to_messages(state.get("messages") or [])
+    completed_sections = state.get("completed_sections") or []
+    final_report = state.get("final_report")
+    reports = [_field(section, "commit_report", "") for section in completed_sections]
+
+    # 기존 방식: 전체 히스토리 + 매 턴 본문 섹션 재전송
+    research_complete = None
+    if completed_sections and not final_report:
+        research_complete = HumanMessage(content=RESEARCH_COMPLETE_MESSAGE + "\n\n".join(reports))
+    full_messages = [SystemMessage(content=system_prompt)] + messages + ([research_complete] if research_complete else [])
+    full_tokens = count_message_tokens(full_messages)
+
+    prefix, turns = split_turns(messages)
+    if keep_turns <= 0:
+        return SupervisorContext(full_messages, full_tokens, full_tokens, 0)
+
+    old_turns, recent_turns = turns[:-keep_turns], turns[-keep_turns:]
+    recent_messages = [message for turn in recent_turns for message in turn]
+    recent_text = "\n".join(message_text(message) for message in recent_messages)
+    reports_in_recent = bool(reports) and all(report in recent_text for report in reports)
+
+    # Conclusion 이후에는 FinishReport 호출만 남으므로 본문을 다시 보내지 않음
+    concluded = any(tool_call["name"] == "Conclusion" for turn in turns for tool_call in turn[0].tool_calls)
+
+    summary_lines = summarize_turns(old_turns, state)
+    if final_report and not concluded and final_report not in recent_text:
+        summary_lines.append(f"\n작성된 Introduction:\n{final_report}")
+    if final_report and not concluded and reports and not reports_in_recent:
+        # Conclusion 작성에는 본문 내용이 필요
+        summary_lines.append("\n완성된 본문 섹션:\n" + "\n\n".join(reports))
+
+    context = [SystemMessage(content=system_prompt)] + prefix
+    if summary_lines:
+        context.append(HumanMessage(content="이전 진행 상황 요약:\n" + "\n".join(summary_lines)))
+    context += recent_messages
+    if research_complete and not reports_in_recent:
+        context.append(research_complete)
+
+    return SupervisorContext(context, full_tokens, count_message_tokens(context), len(old_turns))
@@ -1,5 +1,6 @@
 from typing import Optional, Dict, Any
-from confluent_kafka import Producer
+from .kafka_producer import progress_producer
+import asyncio
 import json
 import os
 import datetime
@@ -16,6 +17,37 @@ def get_config_value(value):
     else:
         return value.value
 
+def get_config_flag(value) -> bool:
+    """
+    환경 변수로 들어온 문자열("true"/"false")까지 고려해 bool 구성 값을 해석하는 함수
+    """
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+async def invoke_tool_calls(tool_calls: list, tools_by_name: dict, config, max_concurrency: int = 1) -> list:
+    """
+    tool_calls를 실행하고 tool_calls와 같은 순서로 결과를 반환합니다.
+    max_concurrency > 1 이면 최대 max_concurrency개씩 동시에 실행합니다.
+    """
+    async def invoke(tool_call):
+        tool = tools_by_name[tool_call["name"]]
+        try:
+            return await tool.ainvoke(tool_call["args"], config)
+        except NotImplementedError:
+            return tool.invoke(tool_call["args"], config)
+
+    if max_concurrency <= 1:
+        return [await invoke(tool_call) for tool_call in tool_calls]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded_invoke(tool_call):
+        async with semaphore:
+            return await invoke(tool_call)
+
+    return await asyncio.gather(*(bounded_invoke(tool_call) for tool_call in tool_calls))
+
 def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
     지정된 검색 API에서 허용된 매개변수만 포함하도록 search_api_config 사전을 필터링합니다.
@@ -54,18 +86,11 @@ def get_today_str() -> str:
 
 def kafka_produce(requestid: str, process: str):
     """
-    Kafka 메시지 전송
+    Kafka 메시지 전송 (프로세스 공용 producer의 큐에 넣고 즉시 반환)
     """
-    producer_conf = {
-    'bootstrap.servers': os.getenv("KAFKA_BROKER_IP")
-}
-
-    producer = Producer(producer_conf)
-    
     try:
-        producer.produce(topic=os.getenv("KAFKA_TOPIC"), key=requestid, value=process.encode("utf-8"))
-        producer.flush()
-        return {"status": "sent", "message": process}
+        progress_producer.produce(key=requestid, value=process)
+        return {"status": "queued", "message": process}
     except Exception as e:
         logging.exception("Failed to send")
-        return {"status": "failed", "message": process}
\ No newline at end of file
+        return {"status": "failed", "message": process}
@@ -2,8 +2,9 @@ import os
 import traceback
 import asyncio
 import logging
+import json
 from fastapi import APIRouter, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 
 #========================================TIL========================================#
@@ -15,6 +16,8 @@ from app.Til_agent.utils import kafka_produce
 from app.Til_agent.agent_schema import InputSchema, CommitDataSchema
 from app.Til_agent.supervisor import SupervisorGraph
 from app.Til_agent.commit_analysis_tools import CommitTools
+from app.Til_agent.research_registry import ResearchRegistry
+from app.Til_agent.request_budget import RequestBudget
 
 import uuid
 from langfuse.langchain import CallbackHandler
@@ -37,7 +40,7 @@ from app.models.interview_model import model
 from app.utils.discord_interview_client import DiscordClientInterview
 from app.evaluation.interview_evaluation.evaluate import InterviewEvaluator
 
-qa_flow = QAFlow(llm=model.llm, qdrant=model.qdrant, templates=PromptTemplates)
+qa_flow = QAFlow(llm=model.llm, qdrant=model.async_qdrant, templates=PromptTemplates)
 graph = qa_flow.build_graph()
 load_dotenv()
 
@@ -52,6 +55,8 @@ discord_client_interview = DiscordClientInterview()
 safe_filter = SafeFilter()
 
 get_commit_data = CommitTools.get_commit_data
+# 파일 수와 무관하게 한 번만 컴파일해서 모든 요청에 재사용
+til_graph = SupervisorGraph().make_supervisor_graph()
 
 # 비동기 Discord 클라이언트 실행
 asyncio.create_task(discord_client.start(os.getenv("DISCORD_BOT_TOKEN")))
@@ -96,14 +101,7 @@ async def safety_filter(state: ContentSchema):
     result = {"result": response.filter_type}
     return result
 
-@router.post("/til")
-async def commit_analysis(state: InputSchema):
-    username = state.owner
-    date = state.date
-    repo = state.repo
-    github_token = state.githubToken
-
-
+def decrypt_github_token(github_token: str) -> str:
     key = os.getenv("GITHUB_PASSWORD_KEY").encode()
     encrypted_b64 = github_token
     cipher_bytes = base64.b64decode(encrypted_b64)
@@ -112,37 +110,57 @@ async def commit_analysis(state: InputSchema):
     decrypted_bytes = cipher.decrypt(cipher_bytes)
 
     try:
-        decrypted = unpad(decrypted_bytes).decode('utf-8')
+        return unpad(decrypted_bytes).decode('utf-8')
     except Exception as e:
         print("❌ 복호화 실패:", e)
+        raise
+
+async def prepare_commit_input(state: InputSchema) -> CommitDataSchema:
+    """GitHub 커밋 데이터를 가져와 그래프 입력으로 변환"""
+    commit_data = await get_commit_data(
+        owner=state.owner, 
+        repo=state.repo, 
+        branch=state.branch, 
+        sha_list=state.sha_list,
+        github_token=decrypt_github_token(state.githubToken)
+    )
+    
+    if state.requestId is not None:
+        kafka_produce(
+            requestid=state.requestId, 
+            process="GET_COMMIT_DATA_FROM_GITHUB"
+        )
+    
+    input_commit = CommitDataSchema(**commit_data)
 
-    try:
-        commit_data = await get_commit_data(
-            owner=state.owner, 
-            repo=state.repo, 
-            branch=state.branch, 
-            sha_list=state.sha_list,
-            github_token=decrypted
+    if state.requestId is not None:
+        kafka_produce(
+            requestid=state.requestId, 
+            process="COMMIT_ANALYSIS_START"
         )
-        
-        if state.requestId is not None:
-            kafka_produce(
-                requestid=state.requestId, 
-                process="GET_COMMIT_DATA_FROM_GITHUB"
-            )
-        
-        input_commit = CommitDataSchema(**commit_data)
-        no_files = len(input_commit.files)
+    
+    input_commit.requestId = state.requestId
+    return input_commit
+
+def make_til_config(callback_handler, research_registry: ResearchRegistry, request_budget: RequestBudget) -> dict:
+    """
+    요청마다 새로 만드는 그래프 실행 config
+    - research_registry: 섹션별 research_team 분기가 검색 결과를 공유
+    - request_budget: LLM 호출 / 토큰 / 검색 / 마감 시간 예산 (콜백으로 LLM 사용량 집계)
+    """
+    return {
+        "callbacks": [callback_handler, request_budget],
+        "configurable": {"research_registry": research_registry, "request_budget": request_budget},
+    }
 
-        if state.requestId is not None:
-            kafka_produce(
-                requestid=state.requestId, 
-                process="COMMIT_ANALYSIS_START"
-            )
-        
-        graph = await SupervisorGraph(no_files=no_files).make_supervisor_graph()
-        input_commit.requestId = state.requestId
+@router.post("/til")
+async def commit_analysis(state: InputSchema):
+    username = state.owner
+    date = state.date
+    repo = state.repo
 
+    try:
+        input_commit = await prepare_commit_input(state)
 
         session_id = str(uuid.uuid4())
         langfuse = get_client()
@@ -155,7 +173,13 @@ async def commit_analysis(state: InputSchema):
                 input=input_commit
             )
 
-            final_result = await graph.ainvoke(input_commit, config={"callbacks": [callback_handler]})
+            research_registry, request_budget = ResearchRegistry(embed_fn=embedding_model.get_embeddings), RequestBudget()
+            final_result = await til_graph.ainvoke(
+                input_commit,
+                config=make_til_config(callback_handler, research_registry, request_budget),
+            )
+            print(f"[research registry] {research_registry.stats()}")
+            print(f"[request budget] {request_budget.stats()}")
             # span.update_trace(output={"response": final_result})
 
         selected_output = {
@@ -183,6 +207,97 @@ async def commit_analysis(state: InputSchema):
         "keywords":selected_output["keywords"]
     }
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _field(obj, key: str, default=None):
+    """그래프 출력이 dict / pydantic 모델 어느 쪽이든 값을 꺼냄"""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+# 토큰 단위로 스트리밍할 supervisor 도구
+STREAMED_SUPERVISOR_TOOLS = {"Introduction", "Conclusion"}
+
+@router.post("/til/stream")
+async def commit_analysis_stream(state: InputSchema):
+    """
+    TIL 생성 진행 상황을 SSE로 전달합니다.
+    event: fetch_done / review_done / research_done / token / final / error
+    """
+    async def event_stream():
+        try:
+            input_commit = await prepare_commit_input(state)
+            yield sse_event("fetch_done", {"files": [file.filepath for file in input_commit.files]})
+
+            tool_streams = {}  # run_id -> (누적 chunk, 지금까지 보낸 content 길이)
+            final_result = None
+            research_registry, request_budget = ResearchRegistry(embed_fn=embedding_model.get_embeddings), RequestBudget()
+
+            async for event in til_graph.astream_events(
+                input_commit,
+                config=make_til_config(CallbackHandler(), research_registry, request_budget),
+                version="v2",
+            ):
+                kind = event["event"]
+                name = event["name"]
+
+                if kind == "on_chain_end" and name == "summarize_file_node":
+                    for section in _field(event["data"]["output"], "sections", []) or []:
+                        yield sse_event("review_done", {
+                            "filename": _field(section, "filename"),
+                            "code_review": _field(section, "code_review"),
+                        })
+
+                elif kind == "on_chain_end" and name == "research_team":
+                    for section in _field(event["data"]["output"], "completed_sections", []) or []:
+                        yield sse_event("research_done", {
+                            "filename": _field(section, "filename"),
+                            "research_keywords": _field(section, "research_keywords"),
+                        })
+
+                elif kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "supervisor":
+                    # 도구 호출 인자(JSON)를 누적 파싱해 content의 새로 생성된 부분만 전달
+                    run_id = event["run_id"]
+                    accumulated, sent = tool_streams.get(run_id, (None, 0))
+                    chunk = event["data"]["chunk"]
+                    accumulated = chunk if accumulated is None else accumulated + chunk
+                    tool_calls = accumulated.tool_calls
+                    if tool_calls and tool_calls[0]["name"] in STREAMED_SUPERVISOR_TOOLS:
+                        content = tool_calls[0]["args"].get("content") or ""
+                        if len(content) > sent:
+                            yield sse_event("token", {
+                                "section": tool_calls[0]["name"].lower(),
+                                "delta": content[sent:],
+                            })
+                            sent = len(content)
+                    tool_streams[run_id] = (accumulated, sent)
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    final_result = event["data"]["output"]
+
+            print(f"[research registry] {research_registry.stats()}")
+            print(f"[request budget] {request_budget.stats()}")
+            content = final_result["final_report"]
+            keywords = final_result["keywords"][:3]
+            yield sse_event("final", {"content": content, "keywords": keywords})
+
+            # 디스코드 팀 채널에 til 결과 전달
+            await discord_client.send_til_to_thread(
+                content=content,
+                username=state.owner
+            )
+
+        except Exception as e:
+            traceback.print_exc()
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 #========================================Interview========================================#
 
 asyncio.create_task(discord_client_interview.start(os.getenv("DISCORD_TOKEN")))
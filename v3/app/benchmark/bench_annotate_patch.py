@@ -0,0 +1,108 @@
+"""
+annotate_code_with_patches 마이크로 벤치마크
+
+수천 줄짜리 파일과 여러 커밋의 patch를 생성해 주석 처리 시간을 측정합니다.
+기존 list.insert 기반 구현과 비교합니다.
+
+실행: (v3 디렉토리에서) python -m app.benchmark.bench_annotate_patch
+"""
+import difflib
+import random
+import timeit
+
+from unidiff import PatchSet
+
+from app.Til_agent.commit_analyze_graph import annotate_code_with_patches
+
+
+def legacy_annotate_code_with_patch(latest_code: str, patch_text: str, filename: str) -> str:
+    """비교용: 변경 줄마다 list.insert를 호출하던 기존 구현"""
+    if not patch_text.startswith('--- '):
+        patch_text = f"--- a/{filename}\n+++ b/{filename}\n" + patch_text
+
+    patch = PatchSet(patch_text)
+    code_lines = latest_code.splitlines()
+    annotated = code_lines.copy()
+
+    target_file = next((f for f in patch if f.path == filename or f.path.endswith(filename)), None)
+    if not target_file:
+        return latest_code
+
+    offset = 0
+    for hunk in target_file:
+        for line in hunk:
+            if line.is_added and line.target_line_no is not None:
+                idx = line.target_line_no - 1
+                if idx < len(annotated) and annotated[idx].strip() == line.value.strip():
+                    annotated[idx] = "[+]" + annotated[idx].rstrip()
+                else:
+                    annotated.insert(idx, "[+]" + line.value.rstrip())
+                offset += 1
+            elif line.is_removed:
+                idx = line.source_line_no - 1 + offset
+                annotated.insert(idx, f"[-] {line.value.rstrip()}")
+                offset += 1
+
+    return "\n".join(annotated)
+
+
+def make_case(no_lines: int, change_ratio: float, no_commits: int, seed: int = 0):
+    """no_lines 줄 파일에 change_ratio 비율로 변경을 가한 no_commits개 커밋의 patch 생성"""
+    rng = random.Random(seed)
+    versions = [[f"value_{i} = compute({i})  # generated" for i in range(no_lines)]]
+    for _ in range(no_commits):
+        lines = versions[-1].copy()
+        for _ in range(int(no_lines * change_ratio)):
+            idx = rng.randrange(len(lines))
+            op = rng.random()
+            if op < 0.4:
+                lines[idx] = lines[idx].replace("compute", "compute_v2")
+            elif op < 0.7:
+                lines.insert(idx, f"added_{rng.randrange(10**6)} = None")
+            elif len(lines) > 1:
+                del lines[idx]
+        versions.append(lines)
+
+    patches = []
+    for before, after in zip(versions, versions[1:]):
+        diff = difflib.unified_diff(
+            [line + "\n" for line in before],
+            [line + "\n" for line in after],
+            "a/generated.py",
+            "b/generated.py",
+        )
+        patches.append("".join(diff))
+    # 최신 코드 = 마지막 커밋, 최신 patch가 먼저 오도록 정렬
+    return "\n".join(versions[-1]), patches[::-1]
+
+
+def run():
+    print(
+        f"{'lines':>8} {'changes':>8} {'commits':>8} "
+        f"{'legacy(ms)':>12} {'merge(ms)':>12} {'merge-all(ms)':>14}"
+    )
+    for no_lines in (2_000, 5_000, 20_000):
+        for change_ratio in (0.05, 0.3):
+            code, patches = make_case(no_lines, change_ratio, no_commits=3)
+            repeat = 5
+
+            legacy = min(timeit.repeat(
+                lambda: legacy_annotate_code_with_patch(code, patches[0], "generated.py"),
+                number=1, repeat=repeat,
+            ))
+            merged = min(timeit.repeat(
+                lambda: annotate_code_with_patches(code, patches[:1], "generated.py"),
+                number=1, repeat=repeat,
+            ))
+            merged_all = min(timeit.repeat(
+                lambda: annotate_code_with_patches(code, patches, "generated.py"),
+                number=1, repeat=repeat,
+            ))
+            print(
+                f"{no_lines:>8} {int(no_lines * change_ratio):>8} {len(patches):>8} "
+                f"{legacy * 1000:>12.2f} {merged * 1000:>12.2f} {merged_all * 1000:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    run()
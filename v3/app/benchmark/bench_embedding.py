@@ -0,0 +1,69 @@
+"""
+EmbeddingModel CPU 처리량 벤치마크
+
+동시 요청 N개를 보냈을 때
+- 기존 구현: 요청마다 forward 2회(grad 1회 + no_grad 1회), 이벤트 루프에서 직접 실행
+- 현재 구현: 전용 워커 스레드에서 micro-batch로 no_grad forward 1회
+의 처리 시간과 초당 처리 문장 수를 비교합니다.
+
+실행: (v3 디렉토리에서) python -m app.benchmark.bench_embedding
+      BENCH_EMBEDDING_MODEL=sentence-transformers/all-MiniLM-L6-v2 로 작은 모델 지정 가능
+"""
+import asyncio
+import os
+import random
+import time
+
+import torch
+
+from app.models.embedding import EbeddingModelConfig, EmbeddingModel
+
+NUM_REQUESTS = int(os.getenv("BENCH_EMBEDDING_REQUESTS", 64))
+WORDS = "embedding batch padding latency throughput token model vector search query answer interview".split()
+
+
+class BenchConfig(EbeddingModelConfig):
+    EMBEDDING_MODEL: str = os.getenv("BENCH_EMBEDDING_MODEL", EbeddingModelConfig.EMBEDDING_MODEL)
+
+
+async def legacy_get_embedding(model: EmbeddingModel, text: str):
+    """비교용: 기존 get_embedding (forward 2회, 이벤트 루프 블로킹)"""
+    inputs = model.embedding_tokenizer(text, return_tensors="pt", truncation=True, max_length=1024)
+    inputs = {k: v.to(model.device) for k, v in inputs.items()}
+    outputs = model.embedding_model(**inputs)
+    with torch.no_grad():
+        outputs = model.embedding_model(**inputs)
+        embeddings = outputs.last_hidden_state.mean(dim=1)
+    return embeddings[0].tolist()
+
+
+async def run(name: str, embed, texts: list[str]) -> list:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(embed(text) for text in texts))
+    elapsed = time.perf_counter() - started
+    print(f"{name:>8}: {elapsed:.2f}s, {len(texts) / elapsed:.1f} texts/s")
+    return results
+
+
+async def main():
+    torch.set_num_threads(os.cpu_count() or 1)
+    model = EmbeddingModel(BenchConfig())
+    random.seed(0)
+    texts = [" ".join(random.choices(WORDS, k=random.randint(8, 64))) for _ in range(NUM_REQUESTS)]
+
+    # 워밍업
+    model.encode(texts[:2])
+
+    print(f"model={BenchConfig.EMBEDDING_MODEL}, device={model.device}, requests={NUM_REQUESTS}")
+    legacy = await run("legacy", lambda text: legacy_get_embedding(model, text), texts)
+    batched = await run("batched", model.get_embedding, texts)
+
+    max_diff = max(
+        float((torch.tensor(a) - torch.tensor(b)).abs().max()) for a, b in zip(legacy, batched)
+    )
+    print(f"max abs diff legacy vs batched: {max_diff:.2e}")
+    await model.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+google_search_async 동시 요청 벤치마크
+
+로컬 stub 서버(Custom Search API JSON + 결과 페이지 HTML)를 띄우고
+동시 검색 요청을 보내 전체 소요 시간과 stub이 받은 TCP 연결 수를 측정합니다.
+공유 세션을 쓰면 연결 수가 요청 수보다 훨씬 적게 유지되어야 합니다.
+
+실행: (v3 디렉토리에서) python -m app.benchmark.bench_google_search
+"""
+import asyncio
+import os
+import socket
+import time
+
+from aiohttp import web
+
+NUM_QUERIES = 50
+RESULTS_PER_QUERY = 2
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = get_free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+# 모듈 import 전에 설정 (Config 클래스 속성이 import 시점에 결정됨)
+os.environ["GOOGLE_API_KEY"] = "bench"
+os.environ["GOOGLE_CX"] = "bench"
+os.environ["GOOGLE_SEARCH_API_URL"] = f"{BASE_URL}/customsearch/v1"
+os.environ["GOOGLE_API_RATE_LIMIT_PER_MINUTE"] = "1000000"
+os.environ["GOOGLE_API_RATE_LIMIT_BURST"] = "1000"
+
+from app.Til_agent.research_team_agent import google_search_async  # noqa: E402
+from app.Til_agent.search_resources import search_resources  # noqa: E402
+
+PAGE_HTML = "<html><body><nav>menu</nav><article>" + "<p>benchmark content</p>" * 200 + "</article></body></html>"
+
+
+def make_app(peers: set) -> web.Application:
+    async def track(request: web.Request):
+        peers.add(request.transport.get_extra_info("peername"))
+
+    async def custom_search(request: web.Request):
+        await track(request)
+        query = request.query["q"]
+        num = int(request.query.get("num", RESULTS_PER_QUERY))
+        items = [
+            {"title": f"{query} {i}", "link": f"{BASE_URL}/page/{query}/{i}", "snippet": f"snippet {i}"}
+            for i in range(num)
+        ]
+        return web.json_response({"items": items})
+
+    async def page(request: web.Request):
+        await track(request)
+        return web.Response(text=PAGE_HTML, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/customsearch/v1", custom_search)
+    app.router.add_get("/page/{query}/{index}", page)
+    return app
+
+
+async def main():
+    peers = set()
+    runner = web.AppRunner(make_app(peers))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    await search_resources.startup()
+
+    try:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            google_search_async.ainvoke({
+                "search_queries": [f"query-{i}"],
+                "max_results": RESULTS_PER_QUERY,
+                "include_raw_content": True,
+            })
+            for i in range(NUM_QUERIES)
+        ])
+        elapsed = time.perf_counter() - started
+    finally:
+        await search_resources.shutdown()
+        await runner.cleanup()
+
+    total_results = sum(len(r["results"]) for response in responses for r in response)
+    total_requests = NUM_QUERIES * (1 + RESULTS_PER_QUERY)
+    print(f"queries: {NUM_QUERIES}, results: {total_results}")
+    print(f"wall time: {elapsed:.2f}s")
+    print(f"HTTP requests: {total_requests}, TCP connections: {len(peers)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
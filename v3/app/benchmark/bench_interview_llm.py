@@ -0,0 +1,128 @@
+"""
+QAFlow LLM 호출 부하 테스트
+
+로컬 OpenAI 호환 stub 서버를 띄우고 /interview 1건과 같은 LLM 호출(질문 3 + 답변 3 + 요약 1)을
+동시 요청 N개로 실행합니다.
+- per-call: 호출마다 init_chat_model로 모델 / HTTP 클라이언트를 새로 생성 (기존 방식)
+- shared: QAFlow.get_chat_model로 profile별 모델 + 공유 커넥션 풀 재사용
+각 방식의 소요 시간, 모델 생성 수, stub이 받은 TCP 연결 수를 출력합니다.
+
+실행: (v3 디렉토리에서) python -m app.benchmark.bench_interview_llm
+"""
+import asyncio
+import os
+import socket
+import time
+
+from aiohttp import web
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = get_free_port()
+NUM_REQUESTS = int(os.getenv("BENCH_INTERVIEW_REQUESTS", 20))
+STUB_LATENCY = float(os.getenv("BENCH_STUB_LATENCY", 0.05))
+
+# 모듈 import 전에 설정
+os.environ["OPENAI_API_KEY"] = "bench"
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+os.environ["EMBEDDING_WARMUP_ON_STARTUP"] = "false"
+
+from langchain.chat_models import init_chat_model  # noqa: E402
+
+from app.models.interview_model import model  # noqa: E402
+from app.nodes.interview_langgraph_nodes import QAFlow  # noqa: E402
+from app.prompts.Interview_Prompts import PromptTemplates  # noqa: E402
+from app.schemas.Interview_Schema import QAState  # noqa: E402
+from app.Til_agent.llm_pool import aclose_llm_clients  # noqa: E402
+
+
+def make_app(peers: set) -> web.Application:
+    async def chat_completions(request: web.Request):
+        peers.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(STUB_LATENCY)
+        return web.json_response({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "HTTP keep-alive는 왜 필요한가요?"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+async def run_interview(qa_flow: QAFlow, state: QAState):
+    """그래프와 같은 순서로 LLM 노드만 실행 (검색 노드 제외)"""
+    questions = {}
+    for partial in await asyncio.gather(*(qa_flow.generate_question_node(i)(state) for i in range(3))):
+        questions.update(partial)
+    state = state.model_copy(update=questions)
+    answers = {}
+    for partial in await asyncio.gather(*(qa_flow.generate_answer_node(i)(state) for i in range(3))):
+        answers.update(partial)
+    await qa_flow.summary_node(state.model_copy(update=answers))
+
+
+async def run(name: str, qa_flow: QAFlow, state: QAState, peers: set, constructions: list):
+    peers.clear()
+    constructions.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(run_interview(qa_flow, state) for _ in range(NUM_REQUESTS)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:>8}: {elapsed:.2f}s, model constructions={len(constructions)}, TCP connections={len(peers)}")
+
+
+async def main():
+    peers = set()
+    runner = web.AppRunner(make_app(peers))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    state = QAState(
+        email="bench@example.com", level=2, title="bench", keywords=["HTTP"],
+        til="오늘은 HTTP keep-alive와 커넥션 풀을 적용해 외부 API 호출 지연을 줄였습니다.", category="network",
+    )
+    constructions = []
+
+    per_call = QAFlow(llm=model.llm, qdrant=model.async_qdrant, templates=PromptTemplates)
+
+    def new_model_per_call(max_tokens: int, temperature: float):
+        constructions.append((max_tokens, temperature))
+        return init_chat_model(model="gpt-4o-mini", max_tokens=max_tokens, temperature=temperature)
+
+    per_call.get_chat_model = new_model_per_call
+
+    shared = QAFlow(llm=model.llm, qdrant=model.async_qdrant, templates=PromptTemplates)
+    build_shared = shared.get_chat_model
+
+    def count_shared(max_tokens: int, temperature: float):
+        if (max_tokens, temperature) not in shared._chat_models:
+            constructions.append((max_tokens, temperature))
+        return build_shared(max_tokens, temperature)
+
+    shared.get_chat_model = count_shared
+
+    print(f"requests={NUM_REQUESTS}, LLM calls per request=7, stub latency={STUB_LATENCY}s")
+    try:
+        await run("per-call", per_call, state, peers, constructions)
+        await run("shared", shared, state, peers, constructions)
+    finally:
+        await aclose_llm_clients()
+        await model.async_qdrant.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
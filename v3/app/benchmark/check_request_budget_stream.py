@@ -0,0 +1,90 @@
+"""
+RequestBudget 스트리밍 토큰 집계 확인
+
+/til/stream처럼 astream_events로 그래프를 실행하면 모든 LLM 호출이 스트리밍 모드로 동작합니다.
+마지막 chunk에 usage_metadata를 싣는 (stream_usage=True) 가짜 채팅 모델을 반복 호출해
+RequestBudget의 토큰 수가 집계되고 토큰 예산에서 멈추는지 확인합니다.
+
+실행: (v3 디렉토리에서) python -m app.benchmark.check_request_budget_stream
+"""
+import asyncio
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from app.Til_agent.request_budget import RequestBudget, get_request_budget
+
+TOKENS_PER_CALL = 120
+MAX_TOKENS = 1000
+MAX_CALLS = 50
+
+
+class UsageStreamingChatModel(GenericFakeChatModel):
+    """AzureChatOpenAI(stream_usage=True)처럼 마지막 chunk에 usage_metadata를 보내는 가짜 모델"""
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                usage_metadata={"input_tokens": TOKENS_PER_CALL - 20, "output_tokens": 20, "total_tokens": TOKENS_PER_CALL},
+            )
+        )
+
+
+def responses() -> Iterator[str]:
+    while True:
+        yield "budget check response"
+
+
+llm = UsageStreamingChatModel(messages=responses())
+
+
+async def call_until_exhausted(state: MessagesState, config: RunnableConfig) -> dict:
+    budget = get_request_budget(config)
+    messages = []
+    for _ in range(MAX_CALLS):
+        if budget.exhausted_reason():
+            break
+        messages.append(await llm.ainvoke("ping", config))
+    return {"messages": messages}
+
+
+async def main():
+    builder = StateGraph(MessagesState)
+    builder.add_node("call_until_exhausted", call_until_exhausted)
+    builder.add_edge(START, "call_until_exhausted")
+    builder.add_edge("call_until_exhausted", END)
+    graph = builder.compile()
+
+    budget = RequestBudget(max_llm_calls=MAX_CALLS, max_tokens=MAX_TOKENS)
+    streamed_chunks = 0
+    async for event in graph.astream_events(
+        {"messages": []},
+        config={"callbacks": [budget], "configurable": {"request_budget": budget}},
+        version="v2",
+    ):
+        if event["event"] == "on_chat_model_stream":
+            streamed_chunks += 1
+
+    stats = budget.stats()
+    print(f"streamed chunks={streamed_chunks}, budget={stats}")
+    assert stats["tokens"] > 0, "스트리밍 호출의 토큰이 집계되지 않음"
+    assert stats["exhausted"] and stats["exhausted"].startswith("토큰"), "토큰 예산에서 멈추지 않음"
+    assert stats["llm_calls"] == -(-MAX_TOKENS // TOKENS_PER_CALL)
+    print("OK: 스트리밍 실행에서도 토큰 예산이 동작합니다")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,38 +1,135 @@
-from transformers import AutoTokenizer, AutoModel
-from typing import List
+from transformers import PreTrainedModel, PreTrainedTokenizerBase
+from typing import List, Optional
+from .embedding_provider import get_embedding_provider
+import concurrent.futures
+import asyncio
 import logging
+import os
 import torch
 
 logger = logging.getLogger(__name__)
 
 class EbeddingModelConfig:
     EMBEDDING_MODEL: str = "BAAI/bge-m3"
+    MAX_LENGTH: int = 1024
+    # 동시 요청을 모아 한 번의 forward로 처리하는 micro-batch 설정
+    MAX_BATCH_SIZE: int = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", 32))
+    MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_MAX_WAIT_MS", 5))
+    # 배치 안에서 길이가 이 배수 이상 차이 나면 별도 forward로 나눠 padding 낭비 방지
+    BUCKET_LENGTH_RATIO: float = float(os.getenv("EMBEDDING_BUCKET_LENGTH_RATIO", 2))
+    BUCKET_MIN_CHARS: int = 128  # 이 길이 이하의 문장끼리는 나누지 않음 (padding 비용보다 forward 호출 비용이 큼)
 
 
 class EmbeddingModel:
+    """
+    BGE-M3 임베딩 엔진
+    - no_grad forward 1회, attention mask 기반 mean pooling
+    - 모델 연산은 전용 워커 스레드 1개에서 실행 (이벤트 루프 블로킹 방지)
+    - 동시에 들어온 요청은 MAX_WAIT_MS 동안 모아 비슷한 길이끼리 padding된 배치로 처리
+    - 가중치는 인터뷰 검색과 공유하는 EmbeddingProvider에서 첫 사용 시 로드
+    """
+
     def __init__(self, config: EbeddingModelConfig = EbeddingModelConfig()):
         self.config = config
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self._initialize_embedding()
+        self.provider = get_embedding_provider(config.EMBEDDING_MODEL)
+        self.device = self.provider.device
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    @property
+    def embedding_tokenizer(self) -> PreTrainedTokenizerBase:
+        return self.provider.tokenizer
+
+    @property
+    def embedding_model(self) -> PreTrainedModel:
+        return self.provider.auto_model
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """동기 배치 임베딩 (워커 스레드에서 호출)"""
+        inputs = self.embedding_tokenizer(
+            texts, return_tensors="pt", padding=True, truncation=True, max_length=self.config.MAX_LENGTH
+        )
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.inference_mode():
+            outputs = self.embedding_model(**inputs)
+            # padding 토큰을 제외한 mean pooling (단건 호출과 같은 결과)
+            mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            embeddings = (outputs.last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return embeddings.cpu().tolist()
 
-    def _initialize_embedding(self):
-        self.embedding_tokenizer = AutoTokenizer.from_pretrained(self.config.EMBEDDING_MODEL)
-        self.embedding_model = AutoModel.from_pretrained(self.config.EMBEDDING_MODEL).to(self.device)
-        self.embedding_model.eval()
+    def encode_bucketed(self, texts: List[str]) -> List[List[float]]:
+        """
+        길이순으로 정렬된 texts를 비슷한 길이끼리 나눠 bucket별로 forward (워커 스레드에서 호출)
+        한 번의 padded forward는 가장 긴 문장 길이로 모든 문장을 채우므로, 짧은 문장과 긴 문장을 분리합니다.
+        """
+        embeddings = []
+        start = 0
+        while start < len(texts):
+            end = start + 1
+            limit = max(len(texts[start]) * self.config.BUCKET_LENGTH_RATIO, self.config.BUCKET_MIN_CHARS)
+            while end < len(texts) and len(texts[end]) <= limit:
+                end += 1
+            embeddings.extend(self.encode(texts[start:end]))
+            start = end
+        return embeddings
 
     async def get_embedding(self, text: str) -> List[float]:
         try:
-            inputs = self.embedding_tokenizer(text, return_tensors="pt", truncation=True, max_length=1024)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            outputs = self.embedding_model(**inputs)
-            with torch.no_grad():
-                outputs = self.embedding_model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)  # mean pooling
-            return embeddings[0].tolist()
+            return (await self.get_embeddings([text]))[0]
         except Exception as e:
             logger.error(f"임베딩 생성 실패: {e}")
             raise
 
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 문장 임베딩 (다른 요청과 함께 micro-batch로 처리)"""
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.done() or self._batcher.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._batcher = loop.create_task(self._batch_loop(self._queue))
+
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _batch_loop(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.config.MAX_WAIT_MS / 1000
+            while len(batch) < self.config.MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 길이순으로 정렬한 뒤 비슷한 길이끼리 나눠 forward (encode_bucketed)
+            batch.sort(key=lambda item: len(item[0]))
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.encode_bucketed, texts)
+            except Exception as e:
+                logger.error(f"배치 임베딩 실패 ({len(texts)}건): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    async def aclose(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     @property
     def embedding_dimension(self) -> int:
-        return self.embedding_model.config.hidden_size
\ No newline at end of file
+        return self.embedding_model.config.hidden_size
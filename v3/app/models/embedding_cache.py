@@ -0,0 +1,54 @@
+from cachetools import LRUCache
+from typing import Callable, List
+import hashlib
+import os
+import threading
+
+
+class EmbeddingCacheConfig:
+    MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 2048))
+
+
+class EmbeddingCache:
+    """
+    텍스트 내용 해시(sha256) 기준 임베딩 LRU 캐시
+    - 같은 TIL을 level만 바꿔 다시 요청하는 경우 등 반복 임베딩 방지 (TIL 단독 벡터를 쓰는 combined 쿼리 모드에서 적중)
+    - 캐시에 없는 텍스트만 모아 한 번의 배치로 임베딩
+    """
+
+    def __init__(self, namespace: str, config: EmbeddingCacheConfig = EmbeddingCacheConfig()):
+        self.namespace = namespace  # 모델 이름 등 (모델이 다르면 다른 키)
+        self._cache = LRUCache(maxsize=config.MAX_ENTRIES)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_or_embed(self, texts: List[str], embed: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        keys = [self.make_key(text) for text in texts]
+        with self._lock:
+            vectors = [self._cache.get(key) for key in keys]
+            missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+            # asyncio.to_thread 워커에서 동시에 호출되므로 통계도 lock 안에서 갱신
+            self.hits += len(texts) - sum(vector is None for vector in vectors)
+            self.misses += len(missing)
+
+        if missing:
+            embedded = dict(zip(missing, embed(missing)))
+            with self._lock:
+                for text in missing:
+                    self._cache[self.make_key(text)] = embedded[text]
+            vectors = [vector if vector is not None else embedded[text] for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._cache),
+            }
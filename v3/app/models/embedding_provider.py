@@ -0,0 +1,57 @@
+from functools import lru_cache
+from sentence_transformers import SentenceTransformer
+from transformers import PreTrainedModel, PreTrainedTokenizerBase
+import logging
+import os
+import threading
+import torch
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingProviderConfig:
+    DEVICE: str = os.getenv("EMBEDDING_DEVICE") or ("cuda" if torch.cuda.is_available() else "cpu")
+    WARMUP_ON_STARTUP: bool = os.getenv("EMBEDDING_WARMUP_ON_STARTUP", "true").lower() == "true"
+
+
+class EmbeddingProvider:
+    """
+    임베딩 모델 가중치를 프로세스에 한 번만 올리고 공유
+    - sentence_transformer: 인터뷰 검색용 (SentenceTransformer pooling / normalize)
+    - tokenizer, auto_model: TIL 임베딩용 (같은 가중치로 mean pooling)
+    첫 사용 시 로드하며, startup에서 warmup()으로 미리 로드할 수 있습니다.
+    """
+
+    def __init__(self, model_name: str, config: EmbeddingProviderConfig = EmbeddingProviderConfig()):
+        self.model_name = model_name
+        self.config = config
+        self.device = torch.device(config.DEVICE)
+        self._sentence_transformer = None
+        self._lock = threading.Lock()
+
+    @property
+    def sentence_transformer(self) -> SentenceTransformer:
+        if self._sentence_transformer is None:
+            with self._lock:
+                if self._sentence_transformer is None:
+                    logger.info(f"임베딩 모델 로드: {self.model_name} ({self.device})")
+                    model = SentenceTransformer(self.model_name, device=str(self.device))
+                    model.eval()
+                    self._sentence_transformer = model
+        return self._sentence_transformer
+
+    @property
+    def tokenizer(self) -> PreTrainedTokenizerBase:
+        return self.sentence_transformer.tokenizer
+
+    @property
+    def auto_model(self) -> PreTrainedModel:
+        # SentenceTransformer의 첫 모듈(Transformer)이 감싸고 있는 HF 모델
+        return self.sentence_transformer[0].auto_model
+
+    def warmup(self):
+        self.sentence_transformer.encode("warmup")
+
+
+@lru_cache()
+def get_embedding_provider(model_name: str = "BAAI/bge-m3") -> EmbeddingProvider:
+    return EmbeddingProvider(model_name)
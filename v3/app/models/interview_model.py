@@ -2,9 +2,10 @@ import os
 import logging
 import google.generativeai as genai
 from typing import List
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from openai import AsyncOpenAI
 from sentence_transformers import SentenceTransformer
+from .embedding_provider import get_embedding_provider
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,8 +20,8 @@ class InterviewModels:
         self.qdrant_host = os.getenv("QDRANT_HOST")
         self.qdrant_port = os.getenv("QDRANT_PORT")
         self.qdrant = self._load_qdrant()
+        self.async_qdrant = self._load_async_qdrant()
         self.embed_model_name = "BAAI/bge-m3"
-        self.embedder = self._load_embedder()
         self.vertex_api_key = os.getenv("VERTEX_API_KEY")
         self.gemini_model = self._load_gemini()
 
@@ -88,7 +89,12 @@ class InterviewModels:
             raise
 
     def _load_embedder(self) -> SentenceTransformer:
-        return SentenceTransformer(self.embed_model_name, device="cpu")
+        # TIL EmbeddingModel과 같은 가중치를 공유 (첫 사용 시 로드)
+        return get_embedding_provider(self.embed_model_name).sentence_transformer
+
+    @property
+    def embedder(self) -> SentenceTransformer:
+        return self._load_embedder()
 
     def _load_qdrant(self) -> QdrantClient:
         return QdrantClient(
@@ -96,6 +102,13 @@ class InterviewModels:
             port=self.qdrant_port
         )
 
+    def _load_async_qdrant(self) -> AsyncQdrantClient:
+        # 그래프 노드(이벤트 루프)에서 사용하는 비동기 클라이언트
+        return AsyncQdrantClient(
+            host=self.qdrant_host,
+            port=self.qdrant_port
+        )
+
     def embed_text(self, text: str) -> List[float]:
         try:
             return self.embedder.encode(text).tolist()
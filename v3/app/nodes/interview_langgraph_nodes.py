@@ -1,24 +1,74 @@
 from langgraph.graph import StateGraph, START
 from langsmith import traceable
-from app.schemas.Interview_Schema import QAState, ContentState
+from app.schemas.Interview_Schema import QAState, ContentState, InterviewQuestions
 from app.models.interview_model import model
 from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+from app.Til_agent.llm_pool import get_http_async_client
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import SearchRequest
+from app.nodes.interview_retrieval import RetrievalConfig, build_filter, combine_vectors, mmr_select, recall_at_k, truncate_to_budget
+from app.models.embedding_cache import EmbeddingCache
+import asyncio
 import logging
+import os
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
+class QAFlowConfig:
+    # true면 세 질문을 구조화 출력 한 번으로 생성 (실패 시 질문별 노드로 fallback)
+    BATCH_QUESTIONS: bool = os.getenv("INTERVIEW_BATCH_QUESTIONS", "false").lower() == "true"
+
 class QAFlow:
-    def __init__(self, llm, qdrant, templates):
+    def __init__(self, llm, qdrant: AsyncQdrantClient, templates,
+                 retrieval_config: RetrievalConfig = RetrievalConfig(), config: QAFlowConfig = QAFlowConfig()):
         self.llm = llm
         self.qdrant = qdrant
         self.templates = templates
-        self.embedding_model = model.embedder
+        self.retrieval_config = retrieval_config
+        self.config = config
+        self._chat_models: dict[tuple, BaseChatModel] = {}
+        self.embedding_cache = EmbeddingCache(namespace=model.embed_model_name)
+
+    def get_chat_model(self, max_tokens: int, temperature: float) -> BaseChatModel:
+        """(max_tokens, temperature) 조합별로 한 번만 생성해 요청 간 재사용 (공유 커넥션 풀 사용)"""
+        key = (max_tokens, temperature)
+        if key not in self._chat_models:
+            self._chat_models[key] = init_chat_model(
+                model="gpt-4o-mini",
+                max_tokens=max_tokens,
+                temperature=temperature,
+                http_async_client=get_http_async_client(),
+            )
+        return self._chat_models[key]
+
+    @property
+    def embedding_model(self):
+        # 공유 임베딩 모델은 첫 사용 시 로드
+        return model.embedder
 
     def embed_text(self, text: str) -> list[float]:
         return self.embedding_model.encode(text).tolist()
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """여러 문장을 한 번의 배치로 임베딩 (캐시에 있는 문장은 제외)"""
+        return self.embedding_cache.get_or_embed(
+            texts, lambda missing: self.embedding_model.encode(missing, batch_size=len(missing)).tolist()
+        )
+
+    def embed_queries(self, til: str, questions: list[str]) -> list[list[float]]:
+        """질문별 검색 쿼리 벡터 (RetrievalConfig.QUERY_EMBEDDING 방식)"""
+        config = self.retrieval_config
+        if config.QUERY_EMBEDDING == "combined":
+            # 한 배치로 묶으면 짧은 질문까지 TIL 길이로 padding되므로 TIL과 질문을 따로 인코딩
+            til_vector = self.embed_texts([til])[0]
+            question_vectors = self.embed_texts(questions)
+            return [combine_vectors(til_vector, vector, config.TIL_WEIGHT) for vector in question_vectors]
+        return self.embed_texts([f"{til}\n{question}" for question in questions])
     
     def clean_korean_question(self, text: str) -> str:
 
@@ -38,10 +88,46 @@ class QAFlow:
 
         return lines[0] if lines else ""
     
+    def build_all_question_prompt(self, level: int) -> str:
+        """레벨별 질문 템플릿 3개를 작성 지침으로 묶고 TIL은 한 번만 포함하는 프롬프트"""
+        tasks = []
+        for i in range(3):
+            task = getattr(self.templates, f"question{i}_prompt_level{level}").replace("{til}", "(위 <TIL> 참고)")
+            tasks.append(f"<question{i} 작성 지침>\n{task.strip()}\n</question{i} 작성 지침>")
+        return self.templates.all_questions_prompt.replace("{tasks}", "\n\n".join(tasks))
+
     def generate_all_question_node(self):
+        question_nodes = [self.generate_question_node(i) for i in range(3)]
+
         @traceable(name=f"전체 질문 생성 노드", run_type="llm")
         async def all_question(state: QAState) -> dict:
-            prompt_str = getattr(self.templates, f"q")
+            prompt = ChatPromptTemplate.from_template(self.build_all_question_prompt(state.level))
+
+            try:
+                llm = self.get_chat_model(max_tokens=384, temperature=0.7)
+
+                question_chain = prompt | llm.with_structured_output(InterviewQuestions)
+                result = await question_chain.ainvoke({
+                    "til": state.til
+                })
+
+                questions = {
+                    f"question{i}": self.clean_korean_question(getattr(result, f"question{i}"))
+                    for i in range(3)
+                }
+                if all(questions.values()):
+                    return questions
+                logger.warning(f"일괄 질문 생성 결과에 빈 질문이 있음 → 질문별 생성으로 fallback: {questions}")
+
+            except Exception as e:
+                logger.warning(f"일괄 질문 생성 실패 → 질문별 생성으로 fallback: {e}")
+
+            update = {}
+            for partial in await asyncio.gather(*(node(state) for node in question_nodes)):
+                update.update(partial)
+            return update
+
+        return all_question
 
 
     def generate_question_node(self, node_id: int):
@@ -51,11 +137,7 @@ class QAFlow:
             prompt1 = ChatPromptTemplate.from_template(prompt1_str)
 
             try:
-                llm = init_chat_model(
-                    model="gpt-4o-mini",
-                    max_tokens = 128,
-                    temperature = 0.7
-                )
+                llm = self.get_chat_model(max_tokens=128, temperature=0.7)
 
                 question_chain = (
                     prompt1
@@ -76,29 +158,62 @@ class QAFlow:
 
         return question_node
     
-    def generate_retriever_node(self, node_id: int):
-        @traceable(name=f"검색 노드 {node_id}", run_type="retriever")
-        async def retriever_node(state: QAState) -> dict:
-            question = getattr(state, f"question{node_id}", "")
-            query = f"{state.til}\n{question}"
-            query_vector = self.embed_text(query)
-
-            results = self.qdrant.search(
-                collection_name="tavily_docs",
-                query_vector=query_vector,
-                limit=1,
-                with_payload=True
-            )
-
-            retrieved_texts = [r.payload["text"] for r in results if "text" in r.payload]
-            best_score = results[0].score if results else 0.0
-
-            return {
-                f"similarity_score{node_id}": best_score,
-                f"retrieved_texts{node_id}": retrieved_texts
-            }
-        
-        return retriever_node
+    async def search_candidates(self, query_vectors: list[list[float]], state: QAState) -> list:
+        """질문별 FETCH_K개 후보 검색 (payload 필터 사용 시 결과가 TOP_K보다 적은 질문은 필터 없이 다시 검색)"""
+        config = self.retrieval_config
+        # MMR을 쓰지 않아도 FETCH_K개를 가져와야 recall@k가 선택된 TOP_K개 밖의 관련 문서까지 셈
+        limit = max(config.FETCH_K, config.TOP_K)
+
+        def requests(vectors, query_filter):
+            return [
+                SearchRequest(vector=vector, limit=limit, filter=query_filter, with_payload=True, with_vector=config.USE_MMR)
+                for vector in vectors
+            ]
+
+        query_filter = build_filter(config.FILTER_FIELD, getattr(state, config.FILTER_STATE_FIELD, None))
+        batch_results = await self.qdrant.search_batch(
+            collection_name=config.COLLECTION_NAME, requests=requests(query_vectors, query_filter)
+        )
+        if query_filter is not None:
+            short = [idx for idx, results in enumerate(batch_results) if len(results) < config.TOP_K]
+            if short:
+                retried = await self.qdrant.search_batch(
+                    collection_name=config.COLLECTION_NAME,
+                    requests=requests([query_vectors[idx] for idx in short], None),
+                )
+                for idx, results in zip(short, retried):
+                    batch_results[idx] = results
+        return batch_results
+
+    @traceable(name="검색 노드", run_type="retriever")
+    async def retriever_node(self, state: QAState) -> dict:
+        """
+        세 질문의 쿼리를 한 번에 임베딩(이벤트 루프 밖에서)하고 search_batch로 top-k 후보 검색
+        → MMR로 TOP_K개 선택 → 컨텍스트 토큰 예산만큼 자름
+        """
+        config = self.retrieval_config
+        started = time.perf_counter()
+        questions = [getattr(state, f"question{i}", "") or "" for i in range(3)]
+        query_vectors = await asyncio.to_thread(self.embed_queries, state.til, questions)
+        batch_results = await self.search_candidates(query_vectors, state)
+
+        update = {}
+        for node_id, (query_vector, results) in enumerate(zip(query_vectors, batch_results)):
+            results = [r for r in results if "text" in (r.payload or {})]
+            if config.USE_MMR:
+                selected = mmr_select(query_vector, [r.vector for r in results], config.TOP_K, config.MMR_LAMBDA)
+            else:
+                selected = list(range(min(config.TOP_K, len(results))))
+
+            texts = [results[idx].payload["text"] for idx in selected]
+            update[f"retrieved_texts{node_id}"] = truncate_to_budget(texts, config.CONTEXT_TOKEN_BUDGET)
+            update[f"similarity_score{node_id}"] = max((results[idx].score for idx in selected), default=0.0)
+            update[f"recall_at_k{node_id}"] = recall_at_k([r.score for r in results], selected, config.RELEVANCE_THRESHOLD)
+
+        update["retrieval_latency_ms"] = (time.perf_counter() - started) * 1000
+        logger.info(f"interview retrieval {update['retrieval_latency_ms']:.0f}ms, recall@{config.TOP_K}="
+                    f"{[update[f'recall_at_k{i}'] for i in range(3)]}, embedding cache={self.embedding_cache.stats()}")
+        return update
 
     def delete_blank(self, text: str) -> str:
         # 1. 수평선 "---" 제거 (줄 단독이거나 앞뒤 개행 포함된 경우)
@@ -143,11 +258,7 @@ class QAFlow:
             prompt2 = ChatPromptTemplate.from_template(prompt2_str)
 
             try:
-                llm = init_chat_model(
-                    model="gpt-4o-mini",
-                    max_tokens = 512,
-                    temperature = 0.3
-                )
+                llm = self.get_chat_model(max_tokens=512, temperature=0.3)
 
                 answer_chain = (
                     prompt2
@@ -214,11 +325,7 @@ class QAFlow:
         for attempt in range(3):
             try:
 
-                llm = init_chat_model(
-                    model="gpt-4o-mini",
-                    max_tokens = 32,
-                    temperature = 0.3
-                )
+                llm = self.get_chat_model(max_tokens=32, temperature=0.3)
 
                 summary_chain = (
                     prompt3
@@ -268,14 +375,22 @@ class QAFlow:
         # workflow.add_node("start", start_node)
         # workflow.set_entry_point("start")
 
+        # 세 질문이 모두 생성되면 검색 노드 하나에서 배치로 검색
+        workflow.add_node("retriever", self.retriever_node)
+
+        if self.config.BATCH_QUESTIONS:
+            workflow.add_node("que_all", self.generate_all_question_node())
+            workflow.add_edge(START, "que_all")
+            workflow.add_edge("que_all", "retriever")
+        else:
+            for i in range(3):
+                workflow.add_node(f"que{i}", self.generate_question_node(i))
+                workflow.add_edge(START, f"que{i}")
+            workflow.add_edge([f"que{i}" for i in range(3)], "retriever")
+
         for i in range(3):
-            workflow.add_node(f"que{i}", self.generate_question_node(i))
-            workflow.add_node(f"retriever{i}", self.generate_retriever_node(i))
             workflow.add_node(f"ans{i}", self.generate_answer_node(i))
-
-            workflow.add_edge(START, f"que{i}")
-            workflow.add_edge(f"que{i}", f"retriever{i}")
-            workflow.add_edge(f"retriever{i}", f"ans{i}")
+            workflow.add_edge("retriever", f"ans{i}")
             workflow.add_edge(f"ans{i}", "summary_generate")
 
         workflow.add_node("summary_generate", self.summary_node)
@@ -0,0 +1,89 @@
+from typing import List, Optional
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue
+from app.Til_agent.code_window import encode_tokens, get_encoding
+import numpy as np
+import os
+
+
+class RetrievalConfig:
+    COLLECTION_NAME: str = os.getenv("COLLECTION_NAME", "tavily_docs")
+    TOP_K: int = int(os.getenv("INTERVIEW_TOP_K", 3))  # 답변 컨텍스트로 사용할 문서 수
+    FETCH_K: int = int(os.getenv("INTERVIEW_FETCH_K", 12))  # 후보 수 (MMR 후보, recall@k 계산 대상)
+    USE_MMR: bool = os.getenv("INTERVIEW_USE_MMR", "true").lower() == "true"
+    MMR_LAMBDA: float = float(os.getenv("INTERVIEW_MMR_LAMBDA", 0.5))  # 1에 가까울수록 관련도, 0에 가까울수록 다양성
+    # payload[FILTER_FIELD] == QAState.<FILTER_STATE_FIELD> 조건으로 검색 (FILTER_FIELD를 비우면 필터 없음)
+    FILTER_FIELD: Optional[str] = os.getenv("INTERVIEW_FILTER_FIELD") or None  # 예: "category", "query"
+    FILTER_STATE_FIELD: str = os.getenv("INTERVIEW_FILTER_STATE_FIELD", "category")
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("INTERVIEW_CONTEXT_TOKEN_BUDGET", 1500))  # 질문 1개당 컨텍스트 토큰
+    RELEVANCE_THRESHOLD: float = float(os.getenv("INTERVIEW_RELEVANCE_THRESHOLD", 0.5))  # recall@k 계산용 관련 문서 기준
+    # 쿼리 임베딩 방식
+    # - combined (기본): TIL 단독 forward 1번 + 짧은 질문 3개 배치 forward 1번, 두 벡터를 가중합
+    #   처음 보는 TIL: TIL 길이 시퀀스 1개 (joint는 3개)
+    #   같은 TIL을 level만 바꿔 다시 요청: TIL 벡터는 캐시에서 가져오고 짧은 질문 3개만 인코딩
+    # - joint: f"{til}\n{question}"을 질문마다 임베딩 (TIL 길이 시퀀스 3개, 질문이 매번 달라 캐시 적중이 거의 없음)
+    QUERY_EMBEDDING: str = os.getenv("INTERVIEW_QUERY_EMBEDDING", "combined")
+    TIL_WEIGHT: float = float(os.getenv("INTERVIEW_TIL_WEIGHT", 0.5))  # combined 모드에서 TIL 벡터 가중치
+
+
+def build_filter(field: Optional[str], value: Optional[str]) -> Optional[Filter]:
+    """payload[field] == value 조건 (field나 value가 없으면 None)"""
+    if not field or not value:
+        return None
+    return Filter(must=[FieldCondition(key=field, match=MatchValue(value=value))])
+
+
+def mmr_select(query_vector: List[float], candidate_vectors: List[List[float]], k: int, lambda_mult: float) -> List[int]:
+    """Maximal Marginal Relevance: 질문과 가깝고 이미 고른 문서와는 덜 겹치는 후보 인덱스 k개"""
+    if not candidate_vectors:
+        return []
+    query = np.asarray(query_vector, dtype=np.float32)
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    query /= np.linalg.norm(query) or 1.0
+    candidates /= np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+    selected = [int(np.argmax(relevance))]
+    while len(selected) < min(k, len(candidates)):
+        redundancy = pairwise[:, selected].max(axis=1)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return selected
+
+
+def combine_vectors(til_vector: List[float], question_vector: List[float], til_weight: float) -> List[float]:
+    """정규화한 TIL / 질문 벡터의 가중합을 다시 정규화"""
+    til = np.asarray(til_vector, dtype=np.float32)
+    question = np.asarray(question_vector, dtype=np.float32)
+    til /= np.linalg.norm(til) or 1.0
+    question /= np.linalg.norm(question) or 1.0
+    combined = til_weight * til + (1 - til_weight) * question
+    return (combined / (np.linalg.norm(combined) or 1.0)).tolist()
+
+
+def recall_at_k(candidate_scores: List[float], selected: List[int], threshold: float) -> Optional[float]:
+    """
+    FETCH_K개 후보 중 threshold 이상인 관련 문서 가운데 선택된 k개에 포함된 비율
+    (후보가 선택된 k개뿐이면 항상 1.0이 되므로 후보는 FETCH_K개로 검색, 관련 문서가 없으면 None)
+    """
+    relevant = {idx for idx, score in enumerate(candidate_scores) if score >= threshold}
+    if not relevant:
+        return None
+    return len(relevant & set(selected)) / len(relevant)
+
+
+def truncate_to_budget(texts: List[str], token_budget: int, model_name: str = "gpt-4o-mini") -> List[str]:
+    """앞(관련도 높은 순)에서부터 token_budget까지만 사용, 넘치는 문서는 잘라서 포함"""
+    kept, used = [], 0
+    for text in texts:
+        tokens = encode_tokens(text, model_name)
+        if used + len(tokens) <= token_budget:
+            kept.append(text)
+            used += len(tokens)
+            continue
+        remaining = token_budget - used
+        if remaining > 0:
+            kept.append(get_encoding(model_name).decode(tokens[:remaining]))
+        break
+    return kept
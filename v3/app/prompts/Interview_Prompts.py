@@ -423,4 +423,16 @@ REST API는 웹 표준을 활용한 간단하고 확장 가능한 API 설계 방
     ---
 
     질문: 
-    """
\ No newline at end of file
+    """
+    all_questions_prompt = """
+    당신은 기술 면접관 AI입니다.
+
+    아래 사용자 TIL을 바탕으로 question0, question1, question2 세 개의 인터뷰 질문을 한 번에 생성하세요.
+    각 질문은 해당 작성 지침을 따르며, 서로 다른 관점을 묻는 한국어 질문 한 문장이어야 합니다.
+
+    <TIL>
+    {til}
+    </TIL>
+
+    {tasks}
+    """
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ContentState(BaseModel):
@@ -6,6 +6,12 @@ class ContentState(BaseModel):
     answer: str 
     summary: Optional[str] = None
 
+class InterviewQuestions(BaseModel):
+    """세 개의 면접 질문을 한 번에 생성하는 구조화 출력"""
+    question0: str = Field(description="question0 작성 지침을 따른 질문")
+    question1: str = Field(description="question1 작성 지침을 따른 질문")
+    question2: str = Field(description="question2 작성 지침을 따른 질문")
+
 class QAState(BaseModel):
     email: str
     level: int
@@ -30,6 +36,8 @@ class QAState(BaseModel):
     recall_at_k1: Optional[float] = None
     recall_at_k2: Optional[float] = None
 
+    retrieval_latency_ms: Optional[float] = None
+
     content0: Optional[ContentState] = None
     content1: Optional[ContentState] = None
     content2: Optional[ContentState] = None
@@ -1,11 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.routes import router
+from app.api.routes import router, embedding_model
+from app.Til_agent.github_fetcher import github_fetcher
+from app.Til_agent.llm_pool import aclose_llm_clients
+from app.Til_agent.kafka_producer import progress_producer
+from app.Til_agent.search_resources import search_resources
+from app.models.embedding_provider import EmbeddingProviderConfig, get_embedding_provider
+from app.models.interview_model import model as interview_model
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from dotenv import load_dotenv
 load_dotenv()
 
-app = FastAPI(debug=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 검색 도구 공유 세션 / 스레드 풀 생성
+    await search_resources.startup()
+    # 공유 임베딩 모델(BGE-M3)을 미리 로드해 첫 요청 지연 방지
+    if EmbeddingProviderConfig.WARMUP_ON_STARTUP:
+        await asyncio.to_thread(get_embedding_provider().warmup)
+    yield
+    # 공유 커넥션 풀 정리
+    await github_fetcher.aclose()
+    await search_resources.shutdown()
+    await interview_model.async_qdrant.close()
+    await aclose_llm_clients()
+    # 임베딩 micro-batch 워커 정리
+    await embedding_model.aclose()
+    # 남은 진행 상황 이벤트 전송
+    progress_producer.close()
+
+app = FastAPI(debug=True, lifespan=lifespan)
 app.include_router(router)
 
 Instrumentator().instrument(app).expose(app)